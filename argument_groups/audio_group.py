@@ -4,5 +4,7 @@ def register_arguments(parser):
     group.add_argument(
         "-a", "--audio",
         type=str,
-        help="Path to audio file to be summarized"
+        nargs="+",
+        action="extend",
+        help="Path(s) to audio files to be summarized. Accepts globs and @list.txt files; may be repeated"
     )
@@ -0,0 +1,16 @@
+DAEMON_ARGUMENTS = ("daemon", "socket")
+
+def register_arguments(parser):
+    """Register arguments for running or reaching the persistent avs daemon."""
+    group = parser.add_argument_group("Daemon Arguments")
+    group.add_argument(
+        "--daemon",
+        action="store_true",
+        default=None,
+        help="Run as a persistent daemon that keeps dependencies and Ollama warm between jobs"
+    )
+    group.add_argument(
+        "--socket",
+        type=str,
+        help="Unix socket path of the avs daemon (default: ~/.avs/avs.sock)"
+    )
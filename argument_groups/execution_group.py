@@ -0,0 +1,30 @@
+import argparse
+
+EXECUTION_ARGUMENTS = ("jobs", "pipeline", "stream")
+
+def non_negative_int(value):
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or a positive integer, got {value}")
+    return number
+
+def register_arguments(parser):
+    """Register arguments controlling how multiple inputs are executed."""
+    group = parser.add_argument_group("Execution Arguments")
+    group.add_argument(
+        "-j", "--jobs",
+        type=non_negative_int,
+        help="Number of inputs to process in parallel (default, or 0: CPU count divided by whisper.cpp threads per job)"
+    )
+    group.add_argument(
+        "--pipeline",
+        action="store_true",
+        default=None,
+        help="Overlap download, extraction, transcription and summarization of different inputs; --jobs then sets the number of concurrent transcriptions"
+    )
+    group.add_argument(
+        "--stream",
+        action="store_true",
+        default=None,
+        help="Print each summary token by token as it is generated (inputs are then processed one at a time)"
+    )
@@ -0,0 +1,30 @@
+import argparse
+
+SUMMARY_ARGUMENTS = ("summarizer", "summary_budget", "salient_lines")
+
+def positive_int(value):
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+def register_arguments(parser):
+    """Register arguments selecting how transcripts are summarized."""
+    group = parser.add_argument_group("Summary Arguments")
+    group.add_argument(
+        "--summarizer",
+        choices=("auto", "ollama", "extractive", "transformer"),
+        help="Summarizer backend: Ollama, the offline extractive summarizer, a local seq2seq model, or Ollama with the extractive one as fallback (default: auto)"
+    )
+    group.add_argument(
+        "--summary-budget",
+        type=float,
+        metavar="SECONDS",
+        help="With --summarizer auto, use the extractive summary when Ollama takes longer than this"
+    )
+    group.add_argument(
+        "--salient-lines",
+        type=positive_int,
+        metavar="N",
+        help="Summarize only the N most salient transcript lines (TF-IDF), shortening the summarizer's input"
+    )
@@ -4,5 +4,7 @@ def register_arguments(parser):
     group.add_argument(
         "-v", "--video",
         type=str,
-        help="Path to video file to be summarized"
+        nargs="+",
+        action="extend",
+        help="Path(s) to video files to be summarized. Accepts globs and @list.txt files; may be repeated"
     )
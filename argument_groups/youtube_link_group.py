@@ -4,5 +4,7 @@ def register_arguments(parser):
     group.add_argument(
         "-yl", "--youtube-link",
         type=str,
-        help="URL of YouTube video to download and summarize"
+        nargs="+",
+        action="extend",
+        help="URL(s) of YouTube videos to download and summarize. Accepts @list.txt files; may be repeated"
     )
@@ -2,148 +2,200 @@ import os
 import logging
 import subprocess
 import sys
-import shutil
-import platform
-import requests
-import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 
-from processors.audio_processor import AudioProcessor
+# Concrete processors are imported on demand by the registry so that heavy dependencies
+# (yt_dlp, requests, ...) only load for the input type that actually needs them.
 from processors.base_processor import BaseProcessor
 from processors.processor_registry import ProcessorRegistry
-from processors.video_processor import VideoProcessor
-from processors.youtube_link_processor import YoutubeLinkProcessor
+from utils import bootstrap_cache
 from utils.ffmpeg_helper import ensure_ffmpeg
+from utils.whisper_paths import WHISPER_BINARY_PATH, WHISPER_CPP_DIR, WHISPER_LIBRARY_PATH, WHISPER_MODEL_PATH
 
 sys.path.append(os.path.dirname(__file__))
 
-OLLAMA_BASE_URL = "http://localhost:11434"
-OLLAMA_MODEL = "mistral"  # smallest model for this usecase
-
-def _check_ollama_installed():
-    """Check if Ollama is installed."""
-    return shutil.which("ollama") is not None
-
-def install_ollama():
-    """Guide the user to install Ollama based on their OS."""
-    logging.info("🔍 Checking for Ollama installation...")
-
-    if _check_ollama_installed():
-        logging.info("✅ Ollama is already installed!")
-        return True
-
-    logging.error("❌ Ollama is not installed.")
-
-    os_type = platform.system()
-
-    if os_type == "Darwin":  # macOS
-        logging.info("\n➡️ Install Ollama using Homebrew:\n   brew install ollama")
-    elif os_type == "Linux":
-        logging.info("\n➡️ Install Ollama using the official script:\n   curl -fsSL https://ollama.com/install.sh | sh")
-    elif os_type == "Windows":
-        logging.info("\n➡️ Download and install Ollama from:\n   https://ollama.com/download")
-    else:
-        logging.info("\n⚠️ Unsupported OS. Please install Ollama manually from:\n   https://ollama.com")
-
-    return False
-
-def start_ollama():
-    """Ensure Ollama service is running."""
-    try:
-        # Run Ollama serve in the background
-        subprocess.Popen(["ollama", "serve"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        logging.info("🚀 Ollama server started successfully.")
-        
-        # Wait for Ollama to be ready
-        for _ in range(10):
-            try:
-                response = requests.get("http://localhost:11434")
-                if response.status_code == 200:
-                    logging.info("✅ Ollama server is running.")
-                    return
-            except requests.exceptions.ConnectionError:
-                time.sleep(2)
-
-        logging.error("❌ Ollama server failed to start.")
-        sys.exit(1)
-
-    except Exception as e:
-        logging.error(f"⚠️ Failed to start Ollama: {e}")
-        sys.exit("🚨 Please install Ollama and try again.")
-
-def ensure_ollama_model():
-    """Ensure the smallest model is available."""
-    try:
-        models = subprocess.run(["ollama", "list"], capture_output=True, text=True)
-        if OLLAMA_MODEL not in models.stdout:
-            logging.info(f"📥 Downloading Ollama model: {OLLAMA_MODEL} ...")
-            subprocess.run(["ollama", "pull", OLLAMA_MODEL], check=True)
-            logging.info("✅ Model downloaded successfully!")
-        else:
-            logging.info(f"✅ Ollama model '{OLLAMA_MODEL}' is already installed.")
-    except Exception as e:
-        logging.error(f"❌ Failed to check or download model: {e}")
-        sys.exit(1)
-
 def download_whisper_model():
+    if bootstrap_cache.is_model_current(WHISPER_MODEL_PATH):
+        logging.info("Whisper model is unchanged since the last run, skipping download.")
+        return True
     try:
         logging.info("Downloading Whisper model...")
-        subprocess.run(["sh", "./third-party/whisper.cpp/models/download-ggml-model.sh", "base.en"], check=True)
+        subprocess.run(["sh", os.path.join(".", WHISPER_CPP_DIR, "models", "download-ggml-model.sh"), "base.en"], check=True)
     except subprocess.CalledProcessError:
         logging.error("Failed to download the model. Check the download script.")
         return False
+    bootstrap_cache.record_model(WHISPER_MODEL_PATH)
     return True
 
 def build_whisper_cpp():
+    if bootstrap_cache.is_build_current(WHISPER_BINARY_PATH, WHISPER_CPP_DIR) and os.path.exists(WHISPER_LIBRARY_PATH):
+        logging.info("whisper.cpp sources are unchanged since the last build, skipping make.")
+        return True
     try:
         logging.info("Building whisper.cpp...")
-        subprocess.run(["make", "-j"], cwd="./third-party/whisper.cpp", check=True)
+        # libwhisper.so serves in-process transcription; the rpath lets it find libggml.so beside it
+        subprocess.run(["make", "-j", "default", os.path.basename(WHISPER_LIBRARY_PATH), r"LDFLAGS=-Wl,-rpath,\$$ORIGIN"],
+                       cwd=WHISPER_CPP_DIR, check=True)
     except subprocess.CalledProcessError:
         logging.error("Failed to build whisper.cpp. Please check for any critical build errors.")
         return False
+    bootstrap_cache.record_build(WHISPER_BINARY_PATH, WHISPER_CPP_DIR)
     return True
 
-def ensure_dependencies():
-    """Ensure all required dependencies are installed and working."""
+def _check_ffmpeg():
     logging.info("Checking FFMPEG binary is present")
     if not ensure_ffmpeg():
         raise RuntimeError("FFmpeg is not installed or not working. Please resolve the issue.")
 
+def _check_whisper_model():
     logging.info("Checking whisper.cpp binary is present else download it")
     if not download_whisper_model():
         raise RuntimeError("Failed to download Whisper model.")
 
+def _check_whisper_build():
     logging.info("Building whisper.cpp binary is present else download it")
     if not build_whisper_cpp():
         raise RuntimeError("Failed to build whisper.cpp. Please resolve build issues.")
 
-def process_input(args):
-    """Dynamically processes input based on arguments."""
-    ensure_dependencies()
+def _check_ollama():
+    from utils.ollama_helper import ensure_ollama_model, install_ollama, start_ollama
 
-    # Check and start Ollama
     if not install_ollama():
-        sys.exit("🚨 Ollama is required but not installed.")
+        raise RuntimeError("🚨 Ollama is required but not installed.")
 
     start_ollama()
     ensure_ollama_model()
 
-    if not any(value is not None for value in vars(args).values()):
-        raise ValueError("No arguments provided.")
+def _check_transformer():
+    from utils.summarizer import TransformerSummarizer
+
+    if not TransformerSummarizer().is_available():
+        raise RuntimeError("--summarizer transformer needs torch and transformers: pip install torch transformers")
+
+# Checks every job needs, whatever the summarizer
+DEPENDENCY_CHECKS = {
+    "FFmpeg": _check_ffmpeg,
+    "Whisper model": _check_whisper_model,
+    "whisper.cpp build": _check_whisper_build,
+}
+
+def _run_checks(checks, optional=()):
+    """Run independent readiness checks concurrently and raise once with every failure.
+
+    Failures of the checks named in `optional` are only logged.
+    """
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        futures = {name: executor.submit(check) for name, check in checks.items()}
+
+    failures = []
+    for name, future in futures.items():
+        try:
+            future.result()
+        except (Exception, SystemExit) as e:
+            # start_ollama/ensure_ollama_model exit on failure; report those like any other error
+            if name in optional:
+                logging.warning(f"{name} is unavailable: {e}")
+            else:
+                failures.append(f"{name}: {e}")
+
+    if failures:
+        raise RuntimeError("Dependency checks failed:\n  " + "\n  ".join(failures))
+
+def bootstrap(summarizer=None):
+    """Run the one-off dependency and Ollama checks needed before any input is processed.
 
+    Ollama is skipped for summarizers that don't use it, and optional when summaries can fall back
+    to the extractive summarizer. The transformer summarizer's dependencies are checked up front.
+    """
+    from utils.summarizer import uses_ollama
+
+    checks = dict(DEPENDENCY_CHECKS)
+    if uses_ollama(summarizer):
+        checks["Ollama"] = _check_ollama
+    if summarizer == "transformer":
+        checks["Local summarization model"] = _check_transformer
+    _run_checks(checks, optional=("Ollama",) if summarizer in (None, "auto") else ())
+
+def collect_jobs(args):
+    """Resolve the provided arguments into a list of (argument, input) jobs."""
     # Discover processors dynamically
     processors_dir = os.path.dirname(__file__)
     ProcessorRegistry.discover_processors(processors_dir)
 
+    provided = [(arg, values) for arg, values in vars(args).items() if values is not None]
+    if not provided:
+        raise ValueError("No arguments provided.")
 
-    # Process the input based on the provided arguments
-    for arg, value in vars(args).items():
-        if value is not None:
-            processor_class = ProcessorRegistry.get_processor(arg)
-            if processor_class:
-                processor_instance = processor_class(value)
-                processor_instance.process()
-                return
-            else:
-                logging.error(f"No processor registered for {arg}")
-
-    raise ValueError("No suitable processor found for the provided input.")
\ No newline at end of file
+    jobs = []
+    for arg, values in provided:
+        if not ProcessorRegistry.get_processor(arg):
+            logging.error(f"No processor registered for {arg}")
+            continue
+        if not isinstance(values, list):
+            values = [values]
+        jobs.extend((arg, value) for value in values)
+
+    if not jobs:
+        raise ValueError("No suitable processor found for the provided input.")
+    return jobs
+
+def run_job(arg, value, output=None, **options):
+    """Run the processor registered for `arg` on a single input and return its summary.
+
+    `options` (stream, summarizer, summary_budget, salient_lines) are passed on to the processor.
+    """
+    # Worker processes start with an empty registry
+    ProcessorRegistry.discover_processors(os.path.dirname(__file__))
+    processor_class = ProcessorRegistry.get_processor(arg)
+    processor_instance = processor_class(value, output=output, **options)
+    return processor_instance.process()
+
+def run_processors(args, output=None, workers=1, pipeline=False, **options):
+    """Process every provided input, emitting each summary as soon as it is ready.
+
+    With `pipeline`, inputs flow through per-stage worker pools and `workers` sets the number of
+    concurrent transcriptions. Otherwise, with more than one input and `workers` other than 1,
+    inputs run across a process pool (`workers=None` sizes it from the CPU count). Otherwise inputs
+    run one after another and, with the `stream` option, summaries are written as they are generated.
+    The `summarizer` option selects the summarizer backend for every input.
+    A failing input is logged and recorded without stopping the rest of the batch.
+    Returns one {"input", "summary"} or {"input", "error"} result per input.
+    """
+    from utils.summarizer import uses_ollama
+    from utils.transcriber import whisper_server_running
+
+    jobs = collect_jobs(args)
+    with ExitStack() as batch:
+        if len(jobs) > 1:
+            # Keep the Whisper and Ollama models loaded between the inputs of a batch
+            batch.enter_context(whisper_server_running())
+            if uses_ollama(options.get("summarizer")):
+                from utils.ollama_helper import get_client
+                batch.enter_context(get_client().pinned())
+        return _run_jobs(jobs, output, workers, pipeline, options)
+
+def _run_jobs(jobs, output, workers, pipeline, options):
+    if pipeline:
+        from utils.pipeline import Pipeline
+        processors = [ProcessorRegistry.get_processor(arg)(value, output=output, **options) for arg, value in jobs]
+        return Pipeline({"transcribe": workers} if workers else None).run(processors)
+
+    if workers != 1 and len(jobs) > 1:
+        from utils.job_executor import run_jobs
+        return run_jobs(jobs, workers=workers, output=output, options=options)
+
+    results = []
+    for index, (arg, value) in enumerate(jobs, start=1):
+        logging.info(f"Processing {arg} input {index}/{len(jobs)}: {value}")
+        try:
+            results.append({"input": value, "summary": run_job(arg, value, output, **options)})
+        except Exception as e:
+            logging.error(f"Failed to process {value}: {e}")
+            results.append({"input": value, "error": str(e)})
+    return results
+
+def process_input(args, workers=1, pipeline=False, **options):
+    """Dynamically processes input based on arguments."""
+    bootstrap(options.get("summarizer"))
+    return run_processors(args, workers=workers, pipeline=pipeline, **options)
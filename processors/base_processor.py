@@ -1,3 +1,4 @@
+import sys
 from abc import ABC, abstractmethod
 
 class BaseProcessor(ABC):
@@ -5,15 +6,77 @@ class BaseProcessor(ABC):
     Abstract base class for all processors.
     Ensures that each processor implements the necessary methods.
     """
-    def __init__(self, path):
+    def __init__(self, path, output=None, stream=False, summarizer=None, summary_budget=None, salient_lines=None):
         self.path = path
+        self.output = output if output is not None else sys.stdout
+        self.stream = stream
+        self.summarizer = summarizer
+        self.summary_budget = summary_budget
+        self.salient_lines = salient_lines
 
     @abstractmethod
+    def stages(self):
+        """
+        Returns the ordered (stage name, function) pairs that turn the input into a summary.
+        Each function receives the previous stage's result, the first one receives the input path.
+        """
+        pass
+
     def process(self):
         """
         Processes the input arguments and performs the desired operation.
+        Returns the generated summary.
         """
-        pass
+        self.prepare()
+        result = self.path
+        for name, stage in self.stages():
+            if name == "summarize" and self.stream:
+                return self.stream_summary(stage, result)
+            result = self.run_stage(name, stage, result)
+        self.print_summary(result)
+        return result
+
+    def run_stage(self, name, stage, value):
+        """
+        Runs one stage. Stages report failures (missing or unsupported input, failed transcription)
+        by returning None, which is raised as an error so the input is recorded as failed.
+        """
+        result = stage(value)
+        if result is None:
+            raise RuntimeError(f"{name} failed for {self.path}")
+        return result
+
+    def prepare(self):
+        """
+        Starts loading the summarization model in the background so it loads while the media is processed.
+        """
+        from utils.summarizer import uses_ollama
+
+        if uses_ollama(self.summarizer) and any(name == "summarize" for name, _ in self.stages()):
+            from utils.ollama_helper import preload_model
+            preload_model()
+
+    def summarize(self, transcript, on_token=None):
+        """
+        Summarizes the transcript with the summarizer backend selected for this job.
+        """
+        from utils.summarizer import summarize_transcription
+        return summarize_transcription(transcript, on_token=on_token, backend=self.summarizer,
+                                       latency_budget=self.summary_budget, keep_lines=self.salient_lines)
+
+    def stream_summary(self, summarize, transcript):
+        """
+        Runs the summarize stage, writing the summary to the output token by token as it is generated.
+        """
+        print(f"\nSummary of {self.path}: ", file=self.output, flush=True)
+
+        def write_token(token):
+            self.output.write(token)
+            self.output.flush()
+
+        summary = summarize(transcript, on_token=write_token)
+        print(file=self.output, flush=True)
+        return summary
 
     def print_summary(self, summary):
-        print(f"\nSummary: \n {summary}")
+        print(f"\nSummary of {self.path}: \n {summary}", file=self.output, flush=True)
@@ -8,25 +8,36 @@ from processors import BaseProcessor
 
 class ProcessorRegistry:
     _registry = {}
+    _classes = {}
 
     @classmethod
     def discover_processors(cls, processors_dir):
-        """Dynamically discover and register processor classes."""
+        """Dynamically discover processor modules without importing them."""
         for file in os.listdir(processors_dir):
             if file.endswith("_processor.py") and file != "__init__.py":
-                module_name = f"processors.{file[:-3]}"
-                try:
-                    module = importlib.import_module(module_name)
-                    for name, obj in inspect.getmembers(module, inspect.isclass):
-                        # Register classes that inherit from BaseProcessor and are not abstract
-                        if issubclass(obj, BaseProcessor) and not inspect.isabstract(obj):
-                            arg_name = file[:-3].replace("_processor", "")
-                            cls._registry[arg_name] = obj
-                            logging.info(f"Registered processor: {arg_name} -> {obj}")
-                except Exception as e:
-                    logging.error(f"Error importing module {module_name}: {e}")
+                arg_name = file[:-3].replace("_processor", "")
+                cls._registry[arg_name] = f"processors.{file[:-3]}"
 
     @classmethod
     def get_processor(cls, arg_name):
-        """Returns the processor class based on the argument name."""
-        return cls._registry.get(arg_name)
\ No newline at end of file
+        """Returns the processor class based on the argument name, importing its module on first use."""
+        if arg_name in cls._classes:
+            return cls._classes[arg_name]
+
+        module_name = cls._registry.get(arg_name)
+        if module_name is None:
+            return None
+
+        try:
+            module = importlib.import_module(module_name)
+        except Exception as e:
+            logging.error(f"Error importing module {module_name}: {e}")
+            return None
+
+        for name, obj in inspect.getmembers(module, inspect.isclass):
+            # Register classes defined in the module that inherit from BaseProcessor and are not abstract
+            if issubclass(obj, BaseProcessor) and not inspect.isabstract(obj) and obj.__module__ == module_name:
+                cls._classes[arg_name] = obj
+                logging.info(f"Registered processor: {arg_name} -> {obj}")
+                return obj
+        return None
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from utils import bootstrap_cache
+
+
+@pytest.fixture(autouse=True)
+def state_path(tmp_path, monkeypatch):
+    path = tmp_path / "state" / "bootstrap_state.json"
+    monkeypatch.setattr(bootstrap_cache, "STATE_PATH", str(path))
+    return path
+
+
+def write(path, content, mtime_ns=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return path
+
+
+def test_model_is_current_only_once_recorded(tmp_path):
+    model = write(tmp_path / "model.bin", b"weights")
+    assert not bootstrap_cache.is_model_current(str(model))
+    bootstrap_cache.record_model(str(model))
+    assert bootstrap_cache.is_model_current(str(model))
+
+
+def test_touched_model_with_the_same_content_stays_current(tmp_path):
+    model = write(tmp_path / "model.bin", b"weights", mtime_ns=1_000_000_000)
+    bootstrap_cache.record_model(str(model))
+    write(model, b"weights", mtime_ns=2_000_000_000)
+    assert bootstrap_cache.is_model_current(str(model))
+    # The new mtime is recorded, so the next check doesn't hash the file again
+    assert bootstrap_cache.get_entry("whisper_model", str(model))["mtime_ns"] == 2_000_000_000
+
+
+def test_changed_or_missing_model_is_stale(tmp_path):
+    model = write(tmp_path / "model.bin", b"weights", mtime_ns=1_000_000_000)
+    bootstrap_cache.record_model(str(model))
+    write(model, b"WEIGHTS", mtime_ns=2_000_000_000)
+    assert not bootstrap_cache.is_model_current(str(model))
+    model.unlink()
+    assert not bootstrap_cache.is_model_current(str(model))
+
+
+def test_build_is_stale_once_a_source_file_changes(tmp_path):
+    source_dir = tmp_path / "whisper.cpp"
+    source = write(source_dir / "src" / "whisper.cpp", b"int main;", mtime_ns=1_000_000_000)
+    binary = write(source_dir / "main", b"binary")
+    bootstrap_cache.record_build(str(binary), str(source_dir))
+    assert bootstrap_cache.is_build_current(str(binary), str(source_dir))
+
+    # Files that aren't sources don't affect the build
+    write(source_dir / "README.md", b"docs")
+    write(source_dir / "models" / "ggml-base.en.bin", b"weights")
+    assert bootstrap_cache.is_build_current(str(binary), str(source_dir))
+
+    write(source, b"int main;", mtime_ns=2_000_000_000)
+    assert not bootstrap_cache.is_build_current(str(binary), str(source_dir))
+
+
+def test_ffmpeg_version_is_forgotten_when_the_binary_changes(tmp_path):
+    ffmpeg = write(tmp_path / "ffmpeg", b"ffmpeg", mtime_ns=1_000_000_000)
+    assert bootstrap_cache.get_ffmpeg_version(str(ffmpeg)) is None
+    bootstrap_cache.record_ffmpeg(str(ffmpeg), "ffmpeg version 7.1")
+    assert bootstrap_cache.get_ffmpeg_version(str(ffmpeg)) == "ffmpeg version 7.1"
+    write(ffmpeg, b"ffmpeg", mtime_ns=2_000_000_000)
+    assert bootstrap_cache.get_ffmpeg_version(str(ffmpeg)) is None
+
+
+def test_unreadable_state_counts_as_empty(tmp_path, state_path):
+    write(state_path, b"{not json")
+    model = write(tmp_path / "model.bin", b"weights")
+    assert not bootstrap_cache.is_model_current(str(model))
+    bootstrap_cache.record_model(str(model))
+    assert bootstrap_cache.is_model_current(str(model))
@@ -0,0 +1,34 @@
+from utils.summarizer import _pack_summaries, pack_texts
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def test_pack_texts_groups_consecutive_texts_within_the_budget():
+    # Every text costs its words plus one separator token
+    assert pack_texts(["a b", "c d", "e"], 5, count_words) == ["a b", "c d e"]
+
+
+def test_pack_texts_splits_an_oversized_text_between_words():
+    chunks = pack_texts(["x", "a b c d e f g", "y"], 5, count_words)
+    assert chunks == ["x", "a b", "c d", "e f", "g", "y"]
+    assert all(count_words(chunk) + 1 <= 5 for chunk in chunks)
+
+
+def test_pack_texts_keeps_an_oversized_single_word():
+    assert pack_texts(["word"], 1, count_words) == ["word"]
+    assert pack_texts([], 5, count_words) == []
+
+
+def test_pack_summaries_puts_at_least_two_summaries_in_every_group():
+    summaries = [f"summary {index} " + "word " * 10 for index in range(5)]
+    groups = _pack_summaries(summaries, 5, count_words)
+    assert groups == [summaries[0:2], summaries[2:5]]
+
+
+def test_pack_summaries_fills_groups_up_to_the_budget():
+    summaries = ["a", "b", "c", "d", "e"]
+    # Each summary costs one word plus two separator tokens
+    assert _pack_summaries(summaries, 9, count_words) == [["a", "b", "c"], ["d", "e"]]
+    assert _pack_summaries(["only"], 9, count_words) == [["only"]]
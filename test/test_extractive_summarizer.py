@@ -0,0 +1,51 @@
+import numpy as np
+
+from utils.extractive_summarizer import lexrank_scores, split_sentences, summarize_extractive, tfidf_matrix
+
+
+def entries(*texts):
+    return [{"timestamp": "00:00:00.000 --> 00:00:01.000", "text": text} for text in texts]
+
+
+def test_split_sentences_joins_segments_and_splits_on_punctuation():
+    assert split_sentences(entries(" The model", " loads once. Then it runs!", " Done?")) == [
+        "The model loads once.", "Then it runs!", "Done?"]
+
+
+def test_split_sentences_falls_back_to_segments_without_punctuation():
+    assert split_sentences(entries(" first line", " ", " second line")) == ["first line", "second line"]
+
+
+def test_tfidf_rows_are_normalized():
+    matrix = tfidf_matrix(["whisper transcribes audio", "ollama summarizes text", "the"])
+    norms = np.linalg.norm(matrix, axis=1)
+    # A sentence made only of stop words has no terms left
+    assert np.allclose(norms, [1.0, 1.0, 0.0])
+
+
+def test_lexrank_ranks_a_central_sentence_above_an_isolated_one():
+    sentences = ["whisper transcribes audio quickly", "whisper transcribes long audio",
+                 "audio goes to whisper", "penguins enjoy cold weather"]
+    scores = lexrank_scores(tfidf_matrix(sentences))
+    assert scores.argmax() != 3
+    assert scores[3] == scores.min()
+
+
+def test_summary_keeps_the_most_central_sentences_in_order():
+    transcript = entries(
+        "Penguins enjoy cold weather.",
+        "Whisper transcribes the audio.",
+        "The audio is transcribed by whisper quickly.",
+        "Whisper handles long audio too.",
+    )
+    summary = summarize_extractive(transcript, max_sentences=2)
+    assert "Penguins" not in summary
+    sentences = split_sentences(transcript)
+    kept = [sentence for sentence in sentences if sentence in summary]
+    assert len(kept) == 2
+    # Selected sentences appear in transcript order
+    assert sorted(kept, key=summary.index) == kept
+
+
+def test_short_transcripts_are_returned_whole():
+    assert summarize_extractive(entries("One.", "Two."), max_sentences=5) == "One. Two."
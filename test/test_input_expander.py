@@ -0,0 +1,29 @@
+from utils.input_expander import expand_inputs
+
+
+def test_plain_inputs_pass_through():
+    assert expand_inputs(["talk.mp3", "https://youtu.be/abc"]) == ["talk.mp3", "https://youtu.be/abc"]
+
+
+def test_globs_expand_to_sorted_matches(tmp_path):
+    for name in ("b.mp3", "a.mp3", "notes.txt"):
+        (tmp_path / name).write_text("")
+    assert expand_inputs([str(tmp_path / "*.mp3")]) == [str(tmp_path / "a.mp3"), str(tmp_path / "b.mp3")]
+
+
+def test_patterns_without_matches_are_kept_literally(tmp_path):
+    url = "https://www.youtube.com/watch?v=abc"
+    assert expand_inputs([url, str(tmp_path / "*.wav")]) == [url, str(tmp_path / "*.wav")]
+
+
+def test_list_files_expand_in_order_skipping_blanks_and_comments(tmp_path):
+    (tmp_path / "x.mp4").write_text("")
+    nested = tmp_path / "more.txt"
+    nested.write_text("second.mp3\n")
+    inputs = tmp_path / "inputs.txt"
+    inputs.write_text(f"# queued talks\nfirst.mp3\n\n  {tmp_path / '*.mp4'}\n@{nested}\n")
+    assert expand_inputs([f"@{inputs}", "last.mp3"]) == ["first.mp3", str(tmp_path / "x.mp4"), "second.mp3", "last.mp3"]
+
+
+def test_at_sign_without_a_list_file_is_kept():
+    assert expand_inputs(["@missing.txt"]) == ["@missing.txt"]
@@ -0,0 +1,37 @@
+from utils.segmenter import choose_boundaries
+
+
+def assert_covers(boundaries, duration, segment_length):
+    assert boundaries[0][0] == 0
+    assert boundaries[-1][1] == duration
+    for (_, end), (start, _) in zip(boundaries, boundaries[1:]):
+        assert end == start
+    assert all(0 <= end - start <= segment_length for start, end in boundaries)
+
+
+def test_choose_boundaries_cuts_in_the_middle_of_nearby_silences():
+    boundaries = choose_boundaries([(290, 292), (580, 584)], 700, 300)
+    assert boundaries == [(0.0, 291.0), (291.0, 582.0), (582.0, 700)]
+    assert_covers(boundaries, 700, 300)
+
+
+def test_choose_boundaries_prefers_the_latest_silence_in_the_window():
+    boundaries = choose_boundaries([(280, 282), (294, 296)], 400, 300)
+    assert boundaries == [(0.0, 295.0), (295.0, 400)]
+
+
+def test_choose_boundaries_ignores_silences_outside_the_search_window():
+    # One silence lies past the target length, the other too far before it
+    boundaries = choose_boundaries([(250, 252), (305, 306)], 500, 300, search_window=30)
+    assert boundaries == [(0.0, 300.0), (300.0, 500)]
+
+
+def test_choose_boundaries_keeps_short_audio_whole():
+    assert choose_boundaries([(10, 11)], 300, 300) == [(0.0, 300)]
+    assert choose_boundaries([], 0, 300) == [(0.0, 0)]
+
+
+def test_choose_boundaries_covers_long_audio_without_silences():
+    boundaries = choose_boundaries([], 1000, 300)
+    assert len(boundaries) == 4
+    assert_covers(boundaries, 1000, 300)
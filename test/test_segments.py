@@ -0,0 +1,41 @@
+from utils.segmenter import fixed_boundaries
+from utils.transcriber import shift_timestamps, stitch_segments
+
+
+def entry(start, end, text):
+    return {"timestamp": f"{start} --> {end}", "text": text}
+
+
+def test_shift_timestamps_rebases_onto_the_original_timeline():
+    shifted = shift_timestamps([entry("00:00:00.000", "00:00:02.250", " Hi")], 300.5)
+    assert shifted == [entry("00:05:00.500", "00:05:02.750", " Hi")]
+
+
+def test_stitch_drops_lines_repeated_in_the_overlap():
+    first = [entry("00:00:00.000", "00:00:05.000", " Hello world."),
+             entry("00:00:05.000", "00:00:10.000", " How are you?")]
+    second = [entry("00:00:09.500", "00:00:10.500", " how are you"),
+              entry("00:00:10.500", "00:00:12.000", " Fine, thanks.")]
+    stitched = stitch_segments([first, second])
+    assert [e["text"] for e in stitched] == [" Hello world.", " How are you?", " Fine, thanks."]
+
+
+def test_stitch_drops_lines_inside_already_transcribed_audio():
+    first = [entry("00:00:00.000", "00:00:10.000", " One.")]
+    second = [entry("00:00:09.000", "00:00:10.000", " Something else."),
+              entry("00:00:09.800", "00:00:11.000", " Two.")]
+    stitched = stitch_segments([first, second])
+    assert [e["text"] for e in stitched] == [" One.", " Two."]
+
+
+def test_stitch_keeps_everything_without_overlap():
+    first = [entry("00:00:00.000", "00:00:05.000", " Same.")]
+    second = [entry("00:00:05.000", "00:00:06.000", " Same.")]
+    assert stitch_segments([first, second]) == first + second
+    assert stitch_segments([[], first]) == first
+
+
+def test_fixed_boundaries_cover_the_duration():
+    boundaries = fixed_boundaries(650, 300)
+    assert boundaries == [(0.0, 300.0), (300.0, 600.0), (600.0, 650)]
+    assert fixed_boundaries(0, 300) == []
@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Wall time allowed for a cold start, interpreter included; the goal is well under 100 ms, the
+# slack absorbs slow CI machines while still catching an eager import of requests, yt_dlp or torch
+STARTUP_BUDGET = 0.5
+RUNS = 3
+# Modules that must only load once a job actually needs them
+DEFERRED_MODULES = ("requests", "yt_dlp", "torch", "transformers")
+
+PRINT_DEFERRED = f"print('imported:', ','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+
+HELP_SCRIPT = f"""
+import runpy, sys
+sys.argv = ["avs", "--help"]
+try:
+    runpy.run_path("avs", run_name="__main__")
+except SystemExit:
+    pass
+{PRINT_DEFERRED}
+"""
+
+AUDIO_PROCESSOR_SCRIPT = f"""
+import os, sys
+import processors
+from processors.processor_registry import ProcessorRegistry
+ProcessorRegistry.discover_processors(os.path.dirname(processors.__file__))
+assert ProcessorRegistry.get_processor("audio") is not None
+{PRINT_DEFERRED}
+"""
+
+
+def fastest_run(cmd):
+    """Run `cmd` from the repository root a few times; return the best wall time and the last output."""
+    best = None
+    for _ in range(RUNS):
+        started_at = time.perf_counter()
+        result = subprocess.run(cmd, cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+        elapsed = time.perf_counter() - started_at
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result.stdout
+
+
+def deferred_imported(output):
+    """Parse the deferred modules a script reported as imported."""
+    line = next(line for line in output.splitlines() if line.startswith("imported:"))
+    return [module for module in line[len("imported:"):].strip().split(",") if module]
+
+
+def test_help_starts_within_budget():
+    elapsed, _ = fastest_run([sys.executable, "./avs", "--help"])
+    assert elapsed < STARTUP_BUDGET, f"avs --help took {elapsed:.3f} s"
+
+
+def test_help_defers_heavy_imports():
+    _, output = fastest_run([sys.executable, "-c", HELP_SCRIPT])
+    assert deferred_imported(output) == [], f"avs --help imported {deferred_imported(output)}"
+
+
+def test_audio_processor_import_within_budget():
+    elapsed, output = fastest_run([sys.executable, "-c", AUDIO_PROCESSOR_SCRIPT])
+    assert elapsed < STARTUP_BUDGET, f"importing the audio processor took {elapsed:.3f} s"
+    assert deferred_imported(output) == [], f"importing the audio processor imported {deferred_imported(output)}"
@@ -0,0 +1,49 @@
+from utils.transcript_filter import filter_transcript, strip_markers
+
+
+def entries(*texts):
+    return [{"timestamp": f"00:00:{index:02d}.000 --> 00:00:{index + 1:02d}.000", "text": text}
+            for index, text in enumerate(texts)]
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def test_strip_markers_removes_non_speech_annotations():
+    assert strip_markers(" [BLANK_AUDIO]") == ""
+    assert strip_markers(" (music playing)") == ""
+    assert strip_markers(" ♪ la la ♪ and then [ Silence ] we spoke") == "la la and then we spoke"
+
+
+def test_filter_drops_markers_and_keeps_timestamps():
+    filtered = filter_transcript(entries(" Hello.", " [BLANK_AUDIO]", " ♪ Goodbye."), count=count_words)
+    assert [entry["text"] for entry in filtered] == ["Hello.", "Goodbye."]
+    assert filtered[1]["timestamp"] == "00:00:02.000 --> 00:00:03.000"
+
+
+def test_filter_drops_lines_repeating_recent_ones():
+    filtered = filter_transcript(entries(" Thank you.", " thank you!", " Next topic.", " Thank you."),
+                                 count=count_words)
+    assert [entry["text"] for entry in filtered] == ["Thank you.", "Next topic."]
+
+
+def test_filter_keeps_repeats_outside_the_dedupe_window():
+    texts = [" Thank you."] + [f" Line {index}." for index in range(5)] + [" Thank you."]
+    filtered = filter_transcript(entries(*texts), count=count_words)
+    assert [entry["text"] for entry in filtered].count("Thank you.") == 2
+
+
+def test_filter_keeps_the_most_salient_lines_in_order():
+    filtered = filter_transcript(entries(
+        " Whisper transcribes the audio.",
+        " Penguins like ice.",
+        " The audio is transcribed by whisper.",
+        " Whisper audio transcription is fast.",
+    ), keep=2, count=count_words)
+    assert [entry["text"] for entry in filtered] == ["Whisper transcribes the audio.",
+                                                     "The audio is transcribed by whisper."]
+
+
+def test_filter_of_an_empty_transcript_is_empty():
+    assert filter_transcript([], keep=3) == []
@@ -0,0 +1,62 @@
+import pytest
+
+from utils import whisper_server
+
+
+@pytest.fixture
+def host(monkeypatch):
+    """A 2-socket host with 4 cores per socket and 2 hyperthreads per core, numbered like Linux does:
+    CPU n and n + 8 are siblings."""
+    def set_cpus(cpus):
+        monkeypatch.setattr(whisper_server.os, "sched_getaffinity", lambda pid: set(cpus), raising=False)
+    monkeypatch.setattr(whisper_server, "_cpu_topology", lambda cpu: ((cpu % 8) // 4, cpu % 4))
+    set_cpus(range(16))
+    return set_cpus
+
+
+def test_cpu_sets_give_every_server_whole_cores_on_one_socket(host):
+    cpu_sets = whisper_server.server_cpu_sets(threads=4)
+    assert cpu_sets == [[0, 8, 1, 9], [2, 10, 3, 11], [4, 12, 5, 13], [6, 14, 7, 15]]
+
+
+def test_cpu_sets_split_every_cpu_exactly_once(host):
+    for servers, threads in ((0, 3), (3, 4), (5, 4), (0, 16), (0, 32)):
+        cpu_sets = whisper_server.server_cpu_sets(servers, threads)
+        assert sorted(cpu for cpu_set in cpu_sets for cpu in cpu_set) == list(range(16))
+        sizes = [len(cpu_set) for cpu_set in cpu_sets]
+        assert max(sizes) - min(sizes) <= 1
+
+
+def test_cpu_sets_count_follows_threads_or_the_requested_servers(host):
+    assert len(whisper_server.server_cpu_sets(threads=3)) == 5
+    assert len(whisper_server.server_cpu_sets(servers=3)) == 3
+    # Never more servers than CPUs, and always at least one
+    assert len(whisper_server.server_cpu_sets(servers=64)) == 16
+    assert len(whisper_server.server_cpu_sets(threads=64)) == 1
+
+
+def test_cpu_sets_only_use_the_cpus_this_process_may_run_on(host):
+    host([2, 3, 10, 11])
+    assert whisper_server.server_cpu_sets(threads=2) == [[2, 10], [3, 11]]
+
+
+class FakeServer:
+    def __init__(self, name, active=0):
+        self.url = name
+        self.active = active
+
+    def ensure_running(self):
+        pass
+
+    def has_exited(self):
+        return False
+
+    def transcribe(self, wav_data):
+        return self.url
+
+
+def test_pool_sends_requests_to_the_least_loaded_server():
+    busy, idle = FakeServer("busy", active=2), FakeServer("idle")
+    pool = whisper_server.WhisperServerPool([busy, idle])
+    assert pool.transcribe(b"") == "idle"
+    assert (busy.active, idle.active) == (2, 0)
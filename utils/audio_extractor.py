@@ -1,14 +1,48 @@
 import subprocess
 import os
 import logging
-from utils.ffmpeg_helper import validate_media_duration
 
-# Define the path to FFmpeg binary
-FFMPEG_PATH = "../third-party/ffmpeg/ffmpeg"
+from utils.ffmpeg_helper import FFMPEG_PATH
+
 SUPPORTED_VIDEO_FORMATS = {".mp4", ".avi", ".mov", ".mkv", ".flv", ".webm"}  # Common video formats
+# whisper.cpp reads 16 kHz mono 16-bit PCM
+WHISPER_SAMPLE_RATE = 16000
+# ffmpeg muxer and codec for each pcm_stream output format
+PCM_OUTPUT_FORMATS = {
+    "wav": ("wav", "pcm_s16le"),
+    "s16le": ("s16le", "pcm_s16le"),
+    "f32le": ("f32le", "pcm_f32le"),
+}
+
+def pcm_stream(input_path, start=None, duration=None, output_format="wav"):
+    """Start ffmpeg decoding the first audio stream of `input_path` to 16 kHz mono PCM on its stdout.
+
+    With `start`/`duration` (seconds) only that part of the input is decoded. `output_format` is a
+    16-bit "wav", or raw "s16le" or "f32le" samples. Returns the running process; nothing is
+    written to disk.
+    """
+    import ffmpeg
+
+    input_options = {}
+    if start is not None:
+        input_options["ss"] = f"{start:.3f}"
+    if duration is not None:
+        input_options["t"] = f"{duration:.3f}"
+    muxer, codec = PCM_OUTPUT_FORMATS[output_format]
+    stream = (
+        ffmpeg
+        .input(input_path, **input_options)
+        .output("pipe:", format=muxer, map="0:a:0", vn=None, ac=1, ar=WHISPER_SAMPLE_RATE, acodec=codec)
+        .global_args("-nostdin", "-loglevel", "error")
+    )
+    logging.debug(f"cmd: {subprocess.list2cmdline(stream.compile(cmd='./' + FFMPEG_PATH))}")
+    return stream.run_async(cmd="./" + FFMPEG_PATH, pipe_stdout=True, pipe_stderr=True)
 
 def extract_audio(video_path):
-    """Extract audio from a video file and save it as an audio file."""
+    """Check that a video file can be transcribed and pass it on.
+
+    Its audio is decoded during transcription and piped straight into whisper.cpp, so no audio file is written.
+    """
     if not os.path.exists(video_path):
         logging.error(f"Video file not found at: {video_path}")
         return None
@@ -18,21 +52,7 @@ def extract_audio(video_path):
         logging.error(f"Unsupported video format for file: {video_path}")
         return None
 
-    # Checking if the duration of audio/video is less than or equal to 5 minutes
-    validate_media_duration(video_path)
-
-    # Generate the output audio file path
-    audio_output_path = os.path.splitext(video_path)[0] + ".wav"  # Saves as an wav file
-
-    # Run FFmpeg to extract audio
-    try:
-        logging.info(f"Extracting audio from: {video_path}")
-        subprocess.run(["./" + FFMPEG_PATH, "-i", video_path, "-q:a", "0", "-map", "a", audio_output_path], check=True)
-        logging.info(f"Audio successfully extracted to: {audio_output_path}")
-        return audio_output_path
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Failed to extract audio: {e}")
-        return None
+    return video_path
 
 def validate_video_format(video_path):
     """Check if the video format is supported by FFmpeg based on the file extension."""
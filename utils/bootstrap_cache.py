@@ -0,0 +1,138 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+# Small state file remembering what the last successful bootstrap saw
+STATE_PATH = os.path.join(os.path.expanduser("~"), ".avs", "bootstrap_state.json")
+SOURCE_EXTENSIONS = {".c", ".cpp", ".h", ".hpp", ".m", ".metal", ".cu", ".mk"}
+
+_state_lock = threading.Lock()
+
+
+def _load_state():
+    try:
+        with open(STATE_PATH, "r") as state_file:
+            return json.load(state_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _state_key(name, path):
+    return f"{name}:{os.path.abspath(path)}"
+
+
+def get_entry(name, path):
+    """Return the recorded fingerprint for `name` at `path`, or None."""
+    with _state_lock:
+        return _load_state().get(_state_key(name, path))
+
+
+def record_entry(name, path, fingerprint):
+    """Persist the fingerprint for `name` at `path`."""
+    with _state_lock:
+        state = _load_state()
+        state[_state_key(name, path)] = fingerprint
+        try:
+            os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+            tmp_path = STATE_PATH + ".tmp"
+            with open(tmp_path, "w") as state_file:
+                json.dump(state, state_file, indent=2)
+            os.replace(tmp_path, STATE_PATH)
+        except OSError as e:
+            logging.warning(f"Unable to write bootstrap state to {STATE_PATH}: {e}")
+
+
+def stat_fingerprint(path):
+    """Return the size and modification time of a file, or None if it doesn't exist."""
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return None
+    return {"size": stat_result.st_size, "mtime_ns": stat_result.st_mtime_ns}
+
+
+def file_checksum(path, chunk_size=1 << 20):
+    """Compute the SHA-256 checksum of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_tree_hash(source_dir):
+    """Hash the path, size and mtime of every source file under `source_dir`.
+
+    Only file metadata is read, so this stays cheap even for large trees.
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith(".") and d not in ("build", "models"))
+        for name in sorted(files):
+            if name != "Makefile" and os.path.splitext(name)[1] not in SOURCE_EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            stat_result = os.stat(path)
+            digest.update(f"{os.path.relpath(path, source_dir)}:{stat_result.st_size}:{stat_result.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def is_model_current(model_path):
+    """Check that the model file matches the recorded size and checksum."""
+    entry = get_entry("whisper_model", model_path)
+    current = stat_fingerprint(model_path)
+    if entry is None or current is None or entry.get("size") != current["size"]:
+        return False
+    if entry.get("mtime_ns") == current["mtime_ns"]:
+        return True
+    # The file was touched; fall back to the checksum before declaring it stale.
+    if file_checksum(model_path) != entry.get("sha256"):
+        return False
+    record_entry("whisper_model", model_path, dict(entry, mtime_ns=current["mtime_ns"]))
+    return True
+
+
+def record_model(model_path):
+    fingerprint = stat_fingerprint(model_path)
+    if fingerprint is not None:
+        fingerprint["sha256"] = file_checksum(model_path)
+        record_entry("whisper_model", model_path, fingerprint)
+
+
+def _build_fingerprint(binary_path, source_dir):
+    binary = stat_fingerprint(binary_path)
+    if binary is None:
+        return None
+    return {"binary_mtime_ns": binary["mtime_ns"], "source_hash": source_tree_hash(source_dir)}
+
+
+def is_build_current(binary_path, source_dir):
+    """Check that the binary was built from the recorded source tree."""
+    entry = get_entry("whisper_build", binary_path)
+    return entry is not None and entry == _build_fingerprint(binary_path, source_dir)
+
+
+def record_build(binary_path, source_dir):
+    fingerprint = _build_fingerprint(binary_path, source_dir)
+    if fingerprint is not None:
+        record_entry("whisper_build", binary_path, fingerprint)
+
+
+def get_ffmpeg_version(binary_path):
+    """Return the recorded ffmpeg version string if the binary is unchanged, else None."""
+    entry = get_entry("ffmpeg", binary_path)
+    current = stat_fingerprint(binary_path)
+    if entry is None or current is None:
+        return None
+    if entry.get("size") != current["size"] or entry.get("mtime_ns") != current["mtime_ns"]:
+        return None
+    return entry.get("version")
+
+
+def record_ffmpeg(binary_path, version):
+    fingerprint = stat_fingerprint(binary_path)
+    if fingerprint is not None:
+        fingerprint["version"] = version
+        record_entry("ffmpeg", binary_path, fingerprint)
@@ -0,0 +1,161 @@
+import argparse
+import json
+import logging
+import os
+import socket
+import socketserver
+import threading
+
+DEFAULT_SOCKET_PATH = os.path.join(os.path.expanduser("~"), ".avs", "avs.sock")
+
+
+def _send_message(stream, message):
+    """Write a single newline-delimited JSON message to the socket stream."""
+    stream.write(json.dumps(message) + "\n")
+    stream.flush()
+
+
+class _SocketOutput:
+    """File-like object that forwards processor output to the client as it is written."""
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text):
+        if text:
+            _send_message(self._stream, {"type": "output", "text": text})
+        return len(text)
+
+    def flush(self):
+        self._stream.flush()
+
+
+class _SocketLogHandler(logging.Handler):
+    """Forward log records emitted by the job's thread to the client."""
+    def __init__(self, stream):
+        super().__init__()
+        self._stream = stream
+        self._thread_id = threading.get_ident()
+
+    def emit(self, record):
+        if record.thread != self._thread_id:
+            return
+        try:
+            _send_message(self._stream, {"type": "log", "level": record.levelno, "message": self.format(record)})
+        except OSError:
+            # The client went away; the job keeps running and logs locally.
+            pass
+
+
+class _JobHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        # Imported here so the client side of this module stays lightweight.
+        from processors import run_processors
+
+        stream = self.connection.makefile("w", encoding="utf-8")
+        request = self.rfile.readline()
+        if not request:
+            return
+
+        log_handler = _SocketLogHandler(stream)
+        log_handler.setFormatter(logging.Formatter("%(message)s"))
+        logging.getLogger().addHandler(log_handler)
+        try:
+            job = json.loads(request)
+            args = argparse.Namespace(**job["args"])
+            results = run_processors(args, output=_SocketOutput(stream),
+                                     workers=job.get("workers", 1), pipeline=job.get("pipeline", False),
+                                     **job.get("options", {}))
+            _send_message(stream, {"type": "done", "results": results})
+        except Exception as e:
+            logging.error(f"Job failed: {e}")
+            try:
+                _send_message(stream, {"type": "error", "message": str(e)})
+            except OSError:
+                pass
+        finally:
+            logging.getLogger().removeHandler(log_handler)
+            stream.close()
+
+
+class _DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def run_daemon(socket_path=DEFAULT_SOCKET_PATH):
+    """Bootstrap dependencies once and serve jobs over a local Unix socket until interrupted."""
+    from processors import bootstrap
+    from utils.ollama_helper import get_client, stop_ollama
+    from utils.transcriber import whisper_server_running
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise RuntimeError("Daemon mode requires Unix domain socket support.")
+
+    # Check for another daemon before the slow bootstrap, which would be wasted on a duplicate
+    os.makedirs(os.path.dirname(socket_path) or ".", exist_ok=True)
+    if os.path.exists(socket_path):
+        if is_daemon_running(socket_path):
+            raise RuntimeError(f"An avs daemon is already listening on {socket_path}")
+        logging.info(f"Removing stale socket: {socket_path}")
+        os.remove(socket_path)
+
+    bootstrap()
+
+    server = _DaemonServer(socket_path, _JobHandler)
+    logging.info(f"🚀 avs daemon listening on {socket_path}")
+    try:
+        # Keep the Whisper and Ollama models loaded for as long as the daemon serves jobs
+        with whisper_server_running(), get_client().pinned():
+            server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("Shutting down avs daemon.")
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        # Only stops a server this daemon launched; an externally managed one is left running
+        stop_ollama()
+
+
+def is_daemon_running(socket_path=DEFAULT_SOCKET_PATH):
+    """Check whether a daemon is accepting connections on the given socket."""
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return False
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+        return True
+    except OSError:
+        return False
+
+
+def submit_job(args, socket_path=DEFAULT_SOCKET_PATH, output=None, workers=1, pipeline=False, **options):
+    """Submit a job to the daemon, stream its output and logs back, and return the per-input results.
+
+    `options` (stream, summarizer, summary_budget, salient_lines) are applied to every input of the job.
+    """
+    # Paths are resolved here because the daemon may run from a different directory.
+    def resolve(value):
+        return os.path.abspath(value) if isinstance(value, str) and os.path.exists(value) else value
+
+    job_args = {
+        key: [resolve(item) for item in value] if isinstance(value, list) else resolve(value)
+        for key, value in vars(args).items()
+    }
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        connection = sock.makefile("rw", encoding="utf-8")
+        _send_message(connection, {"args": job_args, "workers": workers, "pipeline": pipeline, "options": options})
+
+        for line in connection:
+            message = json.loads(line)
+            if message["type"] == "output":
+                print(message["text"], end="", file=output, flush=True)
+            elif message["type"] == "log":
+                logging.log(message["level"], f"[daemon] {message['message']}")
+            elif message["type"] == "done":
+                return message["results"]
+            elif message["type"] == "error":
+                raise RuntimeError(message["message"])
+
+    raise RuntimeError("Connection to the avs daemon closed before the job finished.")
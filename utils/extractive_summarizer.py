@@ -0,0 +1,78 @@
+import re
+
+import numpy as np
+
+# Sentences kept in an extractive summary
+DEFAULT_SUMMARY_SENTENCES = 5
+# LexRank parameters: cosine similarity above which two sentences are linked, and the damping factor
+SIMILARITY_THRESHOLD = 0.1
+DAMPING = 0.85
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-6
+
+STOP_WORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having he her
+here hers herself him himself his how i if in into is it its itself just me more most my myself no nor
+not now of off on once only or other our ours ourselves out over own same she should so some such than
+that the their theirs them themselves then there these they this those through to too under until up
+very was we were what when where which while who whom why will with you your yours yourself yourselves
+um uh yeah okay like gonna really
+""".split())
+
+sentence_boundary_re = re.compile(r"(?<=[.!?])\s+")
+word_re = re.compile(r"[a-z0-9']+")
+
+
+def split_sentences(transcription_data):
+    """Split the transcript into sentences, falling back to transcript segments when there's no punctuation."""
+    full_text = " ".join(entry['text'].strip() for entry in transcription_data)
+    sentences = [sentence.strip() for sentence in sentence_boundary_re.split(full_text) if sentence.strip()]
+    if len(sentences) <= 1:
+        sentences = [entry['text'].strip() for entry in transcription_data if entry['text'].strip()]
+    return sentences
+
+
+def tfidf_matrix(sentences):
+    """Return the L2-normalized TF-IDF matrix (sentences x vocabulary) of the given sentences."""
+    tokenized = [[word for word in word_re.findall(sentence.lower()) if word not in STOP_WORDS] for sentence in sentences]
+    vocabulary = {word: index for index, word in enumerate(sorted({word for words in tokenized for word in words}))}
+    counts = np.zeros((len(sentences), max(len(vocabulary), 1)))
+    rows = [row for row, words in enumerate(tokenized) for _ in words]
+    columns = [vocabulary[word] for words in tokenized for word in words]
+    np.add.at(counts, (rows, columns), 1)
+
+    document_frequency = np.count_nonzero(counts, axis=0)
+    idf = np.log((1 + len(sentences)) / (1 + document_frequency)) + 1
+    weights = counts * idf
+    norms = np.linalg.norm(weights, axis=1, keepdims=True)
+    return np.divide(weights, norms, out=np.zeros_like(weights), where=norms > 0)
+
+
+def lexrank_scores(matrix, threshold=SIMILARITY_THRESHOLD, damping=DAMPING):
+    """Score sentences by their centrality in the thresholded cosine-similarity graph (LexRank)."""
+    count = matrix.shape[0]
+    adjacency = (matrix @ matrix.T > threshold).astype(float)
+    # A sentence's similarity to itself says nothing about its centrality
+    np.fill_diagonal(adjacency, 0)
+    degree = adjacency.sum(axis=1, keepdims=True)
+    transition = np.divide(adjacency, degree, out=np.full_like(adjacency, 1.0 / count), where=degree > 0)
+
+    scores = np.full(count, 1.0 / count)
+    for _ in range(MAX_ITERATIONS):
+        updated = (1 - damping) / count + damping * (transition.T @ scores)
+        if np.abs(updated - scores).sum() < TOLERANCE:
+            return updated
+        scores = updated
+    return scores
+
+
+def summarize_extractive(transcription_data, max_sentences=DEFAULT_SUMMARY_SENTENCES):
+    """Summarize a transcript by picking its most central sentences, kept in their original order."""
+    sentences = split_sentences(transcription_data)
+    if len(sentences) <= max_sentences:
+        return " ".join(sentences)
+
+    scores = lexrank_scores(tfidf_matrix(sentences))
+    selected = np.sort(np.argsort(-scores, kind="stable")[:max_sentences])
+    return " ".join(sentences[index] for index in selected)
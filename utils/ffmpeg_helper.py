@@ -5,6 +5,8 @@ import subprocess
 import os
 import stat
 
+from utils import bootstrap_cache
+
 # Paths
 FFMPEG_PATH = "third-party/ffmpeg/ffmpeg"
 FFMPEG_REPO_URL = "https://git.ffmpeg.org/ffmpeg.git"
@@ -31,9 +33,15 @@ def check_ffmpeg():
     """Check if the FFmpeg binary exists and works."""
     logging.info("Checking if the FFmpeg binary exists and works.")
     if os.path.exists(FFMPEG_PATH):
+        cached_version = bootstrap_cache.get_ffmpeg_version(FFMPEG_PATH)
+        if cached_version:
+            logging.info(f"FFmpeg binary is unchanged since the last check: {cached_version}")
+            return True
         try:
-            subprocess.run(["./" + FFMPEG_PATH, "-version"], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            result = subprocess.run(["./" + FFMPEG_PATH, "-version"], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
             logging.info("FFmpeg binary is found and working.")
+            version = result.stdout.splitlines()[0] if result.stdout else ""
+            bootstrap_cache.record_ffmpeg(FFMPEG_PATH, version)
             return True
         except subprocess.CalledProcessError:
             logging.error("FFmpeg binary is found but not working.")
@@ -50,33 +58,30 @@ def build_ffmpeg():
         if not os.path.exists(FFMPEG_SOURCE_PATH):
             subprocess.run(["git", "clone", FFMPEG_REPO_URL, FFMPEG_SOURCE_PATH], check=True)
 
-        # Step 2: Change to the FFmpeg directory
-        os.chdir(FFMPEG_SOURCE_PATH)
-
-        # Step 3: Run ./configure
+        # Step 2: Run ./configure inside the FFmpeg directory. The working directory is passed to
+        # each subprocess instead of calling os.chdir, which would affect concurrently running checks.
         logging.info("Running ./configure...")
-        subprocess.run(["./configure"], check=True)
+        subprocess.run(["./configure"], cwd=FFMPEG_SOURCE_PATH, check=True)
 
-        # Step 4: Build FFmpeg using make
+        # Step 3: Build FFmpeg using make
         logging.info("Building FFmpeg with make...")
-        subprocess.run(["make"], check=True)
+        subprocess.run(["make"], cwd=FFMPEG_SOURCE_PATH, check=True)
 
-        # Step 5: Ensure the FFmpeg binary exists
-        if not os.path.exists("ffmpeg"):
+        # Step 4: Ensure the FFmpeg binary exists
+        if not os.path.exists(FFMPEG_PATH):
             logging.error("FFmpeg binary not found after build.")
             return False
 
-        # Step 6: Set executable permissions for the binary
+        # Step 5: Set executable permissions for the binary
         if not set_executable_permissions():
             return False
 
-        # Step 7: Validate FFmpeg works after building
+        # Step 6: Validate FFmpeg works after building
         if not check_ffmpeg():
             logging.error("FFmpeg build completed, but the binary is still not working.")
             return False
 
         logging.info("FFmpeg built successfully and is working.")
-        os.chdir("../../../")  # Return to the original directory
         return True
 
     except subprocess.CalledProcessError as e:
@@ -123,16 +128,3 @@ def get_media_duration(file_path):
     except Exception as e:
         logging.error(f"Error extracting media duration: {e}")
         return None
-
-def validate_media_duration(file_path, max_duration=300):
-    """Validate if the media duration is within the allowed limit (5 minutes = 300 seconds)."""
-    duration = get_media_duration(file_path)
-    if duration is not None:
-        if duration > max_duration:
-            logging.error(f"Media duration exceeds 5 minutes: {duration / 60:.2f} minutes")
-            raise ValueError("Audio/video file is too long. Please limit to 5 minutes.")
-        else:
-            logging.info(f"Media duration is valid: {duration / 60:.2f} minutes")
-    else:
-        logging.error("Unable to validate media duration.")
-        raise ValueError("Unable to determine the media duration.")
\ No newline at end of file
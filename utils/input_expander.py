@@ -0,0 +1,30 @@
+import glob
+import logging
+import os
+
+GLOB_CHARACTERS = "*?["
+
+
+def read_input_list(list_path):
+    """Read one input per line from a list file, skipping blank lines and # comments."""
+    with open(list_path, "r") as list_file:
+        return [line.strip() for line in list_file if line.strip() and not line.lstrip().startswith("#")]
+
+
+def expand_inputs(values):
+    """Expand `@list.txt` files and glob patterns into individual inputs.
+
+    Patterns that match nothing are kept as-is, so URLs containing `?` pass through untouched.
+    """
+    expanded = []
+    for value in values:
+        if value.startswith("@") and os.path.isfile(value[1:]):
+            expanded.extend(expand_inputs(read_input_list(value[1:])))
+        elif any(char in value for char in GLOB_CHARACTERS):
+            matches = sorted(glob.glob(value))
+            if not matches:
+                logging.debug(f"Pattern matched no files, using it literally: {value}")
+            expanded.extend(matches or [value])
+        else:
+            expanded.append(value)
+    return expanded
@@ -0,0 +1,79 @@
+import io
+import logging
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.transcriber import WHISPER_THREADS
+
+
+def default_worker_count(job_count, threads_per_job=WHISPER_THREADS):
+    """Size the pool so concurrent whisper.cpp processes fill the CPUs without oversubscribing them."""
+    workers = max(1, (os.cpu_count() or 1) // threads_per_job)
+    return max(1, min(workers, job_count))
+
+
+def _init_worker(log_level, cpu_budget, ollama_concurrency, keep_alive):
+    from utils.summarizer import set_ollama_concurrency
+    from utils.transcriber import set_cpu_budget
+
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(processName)s - %(levelname)s - %(message)s')
+    # Keep each job's segment-parallel transcription within its share of the host
+    set_cpu_budget(cpu_budget)
+    # and its summarization requests within its share of the Ollama server's parallel slots
+    set_ollama_concurrency(ollama_concurrency)
+    # Requests from workers must not undo a model pin held by the parent
+    if keep_alive is not None:
+        from utils.ollama_helper import get_client
+        get_client().keep_alive = keep_alive
+
+
+def _run_job(arg, value, options):
+    """Run a single job in a worker process, capturing what the processor prints."""
+    from processors import run_job
+
+    output = io.StringIO()
+    summary = run_job(arg, value, output=output, **options)
+    return summary, output.getvalue()
+
+
+def run_jobs(jobs, workers=None, output=None, options=None):
+    """Run (argument, input) jobs across a process pool, passing `options` on to every processor.
+
+    Each job's output is written as soon as it completes; results are returned in input order.
+    """
+    from utils.summarizer import OLLAMA_CONCURRENCY, uses_ollama
+
+    options = options or {}
+    output = output if output is not None else sys.stdout
+    workers = workers or default_worker_count(len(jobs))
+    # Only Ollama summaries need the parent's keep_alive; other backends never create a client
+    keep_alive = None
+    if uses_ollama(options.get("summarizer")):
+        from utils.ollama_helper import get_client
+        keep_alive = get_client().keep_alive
+    logging.info(f"Running {len(jobs)} jobs across {workers} worker processes")
+
+    results = [None] * len(jobs)
+    # spawn keeps workers independent of the parent's threads (the daemon serves jobs from threads)
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker,
+                             initargs=(logging.getLogger().getEffectiveLevel(),
+                                       (os.cpu_count() or 1) // workers,
+                                       OLLAMA_CONCURRENCY // workers,
+                                       keep_alive)) as executor:
+        futures = {executor.submit(_run_job, arg, value, options): index for index, (arg, value) in enumerate(jobs)}
+        for future in as_completed(futures):
+            index = futures[future]
+            value = jobs[index][1]
+            try:
+                summary, printed = future.result()
+                output.write(printed)
+                output.flush()
+                results[index] = {"input": value, "summary": summary}
+            except Exception as e:
+                logging.error(f"Failed to process {value}: {e}")
+                results[index] = {"input": value, "error": str(e)}
+    return results
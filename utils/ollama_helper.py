@@ -0,0 +1,271 @@
+import logging
+import os
+import platform
+import shutil
+import json
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from utils.readiness import wait_until_ready
+
+OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_MODEL = "mistral"  # smallest model for this usecase
+
+# How long to wait for an `ollama serve` we launched ourselves to come up
+STARTUP_TIMEOUT = 20
+
+# API client defaults: (connect, read) timeouts in seconds, retries for failed requests,
+# and how long the server keeps the model loaded after a request
+REQUEST_TIMEOUT = (5, 300)
+REQUEST_RETRIES = 2
+RETRY_BACKOFF = 1.0
+DEFAULT_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "5m")
+PINNED_KEEP_ALIVE = -1  # never unload
+CONNECTION_POOL_SIZE = 8
+
+# The `ollama serve` child launched by this process, if any
+_ollama_process = None
+
+# Shared API client, created on first use
+_client = None
+_client_lock = threading.Lock()
+# Background request loading the model ahead of summarization
+_preload_thread = None
+
+def _ollama_env():
+    """Environment pointing the ollama CLI at the configured server address."""
+    return dict(os.environ, OLLAMA_HOST=urlparse(OLLAMA_BASE_URL).netloc)
+
+def _check_ollama_installed():
+    """Check if Ollama is installed."""
+    return shutil.which("ollama") is not None
+
+def install_ollama():
+    """Guide the user to install Ollama based on their OS."""
+    logging.info("🔍 Checking for Ollama installation...")
+
+    if _check_ollama_installed():
+        logging.info("✅ Ollama is already installed!")
+        return True
+
+    logging.error("❌ Ollama is not installed.")
+
+    os_type = platform.system()
+
+    if os_type == "Darwin":  # macOS
+        logging.info("\n➡️ Install Ollama using Homebrew:\n   brew install ollama")
+    elif os_type == "Linux":
+        logging.info("\n➡️ Install Ollama using the official script:\n   curl -fsSL https://ollama.com/install.sh | sh")
+    elif os_type == "Windows":
+        logging.info("\n➡️ Download and install Ollama from:\n   https://ollama.com/download")
+    else:
+        logging.info("\n⚠️ Unsupported OS. Please install Ollama manually from:\n   https://ollama.com")
+
+    return False
+
+def is_ollama_running(timeout=1):
+    """Health-check the configured Ollama server."""
+    import requests
+
+    try:
+        response = requests.get(OLLAMA_BASE_URL, timeout=timeout)
+        return response.status_code == 200
+    except requests.exceptions.RequestException:
+        return False
+
+def start_ollama():
+    """Ensure Ollama service is running, reusing a server that is already up."""
+    global _ollama_process
+
+    if is_ollama_running():
+        logging.info(f"✅ Ollama server is already running at {OLLAMA_BASE_URL}.")
+        return
+
+    try:
+        # Run Ollama serve in the background, bound to the configured address
+        _ollama_process = subprocess.Popen(["ollama", "serve"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=_ollama_env())
+        logging.info("🚀 Ollama server started successfully.")
+    except Exception as e:
+        logging.error(f"⚠️ Failed to start Ollama: {e}")
+        sys.exit("🚨 Please install Ollama and try again.")
+
+    if wait_until_ready(is_ollama_running, _ollama_process, STARTUP_TIMEOUT):
+        logging.info("✅ Ollama server is running.")
+        return
+    if _ollama_process.poll() is not None:
+        logging.error(f"❌ Ollama server exited with code {_ollama_process.returncode}.")
+
+    logging.error("❌ Ollama server failed to start.")
+    stop_ollama()
+    sys.exit(1)
+
+def stop_ollama(timeout=5):
+    """Shut down the Ollama server if this process launched it."""
+    global _ollama_process
+
+    if _ollama_process is None:
+        return
+    if _ollama_process.poll() is None:
+        logging.info("Stopping Ollama server...")
+        _ollama_process.terminate()
+        try:
+            _ollama_process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _ollama_process.kill()
+            _ollama_process.wait()
+    _ollama_process = None
+
+def ensure_ollama_model():
+    """Ensure the smallest model is available."""
+    try:
+        models = subprocess.run(["ollama", "list"], capture_output=True, text=True, env=_ollama_env())
+        if OLLAMA_MODEL not in models.stdout:
+            logging.info(f"📥 Downloading Ollama model: {OLLAMA_MODEL} ...")
+            subprocess.run(["ollama", "pull", OLLAMA_MODEL], check=True, env=_ollama_env())
+            logging.info("✅ Model downloaded successfully!")
+        else:
+            logging.info(f"✅ Ollama model '{OLLAMA_MODEL}' is already installed.")
+    except Exception as e:
+        logging.error(f"❌ Failed to check or download model: {e}")
+        sys.exit(1)
+
+class OllamaClient:
+    """
+    Client for the Ollama generate API that reuses pooled keep-alive connections across requests
+    and tells the server how long to keep the model loaded afterwards.
+    """
+    def __init__(self, base_url=OLLAMA_BASE_URL, model=OLLAMA_MODEL, timeout=REQUEST_TIMEOUT,
+                 retries=REQUEST_RETRIES, keep_alive=DEFAULT_KEEP_ALIVE, pool_size=CONNECTION_POOL_SIZE):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.base_url = base_url
+        self.model = model
+        self.timeout = timeout
+        self.retries = retries
+        self.keep_alive = keep_alive
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _payload(self, prompt, stream, options):
+        data = {"model": self.model, "prompt": prompt, "stream": stream, "keep_alive": self.keep_alive}
+        if options:
+            data["options"] = options
+        return data
+
+    def generate(self, prompt, options=None, deadline=None):
+        """Generate a complete response, retrying connection errors, timeouts and server errors.
+
+        Returns the response body; raises requests.exceptions.RequestException once retries run out.
+        With `deadline` (a time.monotonic() value) the response is streamed instead, without retries,
+        and abandoned with requests.exceptions.Timeout once the deadline passes; closing its connection
+        makes the server stop generating.
+        """
+        import requests
+
+        if deadline is not None:
+            parts = []
+            for chunk in self.stream(prompt, options, deadline):
+                parts.append(chunk.get("response", ""))
+                if chunk.get("done"):
+                    return {**chunk, "response": "".join(parts)}
+            raise requests.exceptions.RequestException("Ollama closed the response before it was done")
+
+        url = f"{self.base_url}/api/generate"
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.post(url, json=self._payload(prompt, False, options), timeout=self.timeout)
+                response.raise_for_status()
+                return response.json()
+            except requests.exceptions.RequestException as e:
+                retryable = not isinstance(e, requests.exceptions.HTTPError) or e.response.status_code >= 500
+                if not retryable or attempt == self.retries:
+                    raise
+                logging.warning(f"Ollama request failed ({e}), retrying...")
+                time.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+    def stream(self, prompt, options=None, deadline=None):
+        """Yield the JSON chunks of a streamed response as they arrive.
+
+        With `deadline` (a time.monotonic() value) the request is abandoned with
+        requests.exceptions.Timeout once it passes.
+        """
+        import requests
+
+        url = f"{self.base_url}/api/generate"
+        timeout = self.timeout
+        if deadline is not None:
+            # Bounds the wait for the first token too, while the server is still reading the prompt
+            connect_timeout, read_timeout = self.timeout
+            timeout = (connect_timeout, max(0.001, min(read_timeout, deadline - time.monotonic())))
+        with self.session.post(url, json=self._payload(prompt, True, options), stream=True, timeout=timeout) as response:
+            response.raise_for_status()
+            # Ollama streams one JSON object per line
+            for line in response.iter_lines():
+                if deadline is not None and time.monotonic() >= deadline:
+                    # Leaving the block closes the connection, which cancels the generation
+                    raise requests.exceptions.Timeout("Ollama request passed its deadline")
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if "error" in chunk:
+                    raise requests.exceptions.RequestException(chunk["error"])
+                yield chunk
+                if chunk.get("done"):
+                    return
+
+    def load_model(self, keep_alive=None):
+        """Load the model with an empty request, applying `keep_alive` (default: the client's) right away."""
+        if keep_alive is not None:
+            self.keep_alive = keep_alive
+        url = f"{self.base_url}/api/generate"
+        self.session.post(url, json={"model": self.model, "keep_alive": self.keep_alive}, timeout=self.timeout).raise_for_status()
+
+    @contextmanager
+    def pinned(self):
+        """Keep the model loaded for the duration of a batch or daemon, then restore the previous keep_alive."""
+        import requests
+
+        previous = self.keep_alive
+        self.keep_alive = PINNED_KEEP_ALIVE
+        try:
+            yield self
+        finally:
+            try:
+                self.load_model(previous)
+            except requests.exceptions.RequestException as e:
+                logging.warning(f"Unable to restore Ollama keep_alive: {e}")
+
+    def close(self):
+        self.session.close()
+
+def get_client():
+    """Return the process-wide Ollama client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OllamaClient()
+        return _client
+
+def preload_model():
+    """Start loading the model in the background so it is ready by the time summarization begins."""
+    global _preload_thread
+    with _client_lock:
+        if _preload_thread is not None and _preload_thread.is_alive():
+            return
+        _preload_thread = threading.Thread(target=_preload, name="ollama-preload", daemon=True)
+        _preload_thread.start()
+
+def _preload():
+    started_at = time.monotonic()
+    try:
+        get_client().load_model()
+        logging.info(f"Ollama model '{OLLAMA_MODEL}' loaded in the background in {time.monotonic() - started_at:.2f} s")
+    except Exception as e:
+        logging.warning(f"Background load of the Ollama model failed: {e}")
@@ -0,0 +1,103 @@
+import logging
+import os
+import queue
+import threading
+
+from utils.transcriber import WHISPER_THREADS, set_cpu_budget
+
+PIPELINE_STAGES = ("download", "extract", "transcribe", "summarize")
+# Items allowed to wait between two stages before the upstream stage blocks
+DEFAULT_QUEUE_SIZE = 2
+
+_STOP = object()
+
+
+def default_stage_workers():
+    """Worker threads per stage. Transcription is CPU bound, the others wait on network, disk or Ollama."""
+    return {
+        "download": 2,
+        "extract": 2,
+        "transcribe": max(1, (os.cpu_count() or 1) // WHISPER_THREADS),
+        "summarize": 1,
+    }
+
+
+class Pipeline:
+    """
+    Runs processors through download, extract, transcribe and summarize stages concurrently.
+    Every stage has its own pool of worker threads and hands items to the next stage through a
+    bounded queue, so input N+1 can download while input N transcribes and input N-1 summarizes.
+    Processors that don't define a stage skip it.
+    """
+    def __init__(self, stage_workers=None, queue_size=DEFAULT_QUEUE_SIZE):
+        self.stage_workers = default_stage_workers()
+        self.stage_workers.update(stage_workers or {})
+        self.queue_size = queue_size
+
+    def run(self, processors):
+        """Run every processor through the pipeline and return results in input order."""
+        # Concurrent transcriptions split the cores between them
+        previous_budget = set_cpu_budget((os.cpu_count() or 1) // self.stage_workers["transcribe"])
+        try:
+            return self._run_stages(processors)
+        finally:
+            # A daemon runs later jobs in this process, which must get the whole host again
+            set_cpu_budget(previous_budget)
+
+    def _run_stages(self, processors):
+        results = [None] * len(processors)
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in PIPELINE_STAGES]
+        stage_threads = []
+
+        for position, stage_name in enumerate(PIPELINE_STAGES):
+            next_queue = queues[position + 1] if position + 1 < len(queues) else None
+            threads = [
+                threading.Thread(
+                    target=self._stage_worker,
+                    args=(stage_name, queues[position], next_queue, results),
+                    name=f"{stage_name}-{i}",
+                    daemon=True,
+                )
+                for i in range(self.stage_workers[stage_name])
+            ]
+            for thread in threads:
+                thread.start()
+            stage_threads.append(threads)
+
+        # Feeding blocks once the first queue is full, which is what bounds work in flight
+        for index, processor in enumerate(processors):
+            processor.prepare()
+            queues[0].put((index, processor, processor.path))
+
+        # Drain the stages in order: a stage is stopped only after every upstream item has passed it
+        for position, threads in enumerate(stage_threads):
+            for _ in threads:
+                queues[position].put(_STOP)
+            for thread in threads:
+                thread.join()
+
+        return results
+
+    def _stage_worker(self, stage_name, input_queue, output_queue, results):
+        while True:
+            item = input_queue.get()
+            if item is _STOP:
+                return
+
+            index, processor, value = item
+            # Any failure only fails this item: a dead worker would leave the stages draining forever
+            try:
+                stage = dict(processor.stages()).get(stage_name)
+                if stage is not None:
+                    logging.info(f"[{stage_name}] {processor.path}")
+                    value = processor.run_stage(stage_name, stage, value)
+                if output_queue is None:
+                    processor.print_summary(value)
+                    results[index] = {"input": processor.path, "summary": value}
+            except Exception as e:
+                logging.error(f"Failed to process {processor.path} during {stage_name}: {e}")
+                results[index] = {"input": processor.path, "error": str(e)}
+                continue
+
+            if output_queue is not None:
+                output_queue.put((index, processor, value))
@@ -0,0 +1,22 @@
+import time
+
+# Polling of a freshly launched server: start at a few milliseconds and back off exponentially
+STARTUP_INITIAL_DELAY = 0.05
+STARTUP_MAX_DELAY = 1.0
+
+
+def wait_until_ready(is_ready, process, timeout):
+    """Poll `is_ready(timeout=...)` until it succeeds, `process` exits or `timeout` seconds pass.
+
+    Returns whether the server came up.
+    """
+    delay = STARTUP_INITIAL_DELAY
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if is_ready(timeout=STARTUP_MAX_DELAY):
+            return True
+        if process.poll() is not None:
+            return False
+        time.sleep(delay)
+        delay = min(delay * 2, STARTUP_MAX_DELAY)
+    return False
@@ -0,0 +1,86 @@
+import logging
+import re
+import subprocess
+
+from utils.ffmpeg_helper import FFMPEG_PATH
+
+# Level (dB) and minimum length (seconds) below which audio counts as silence
+SILENCE_THRESHOLD = -35
+SILENCE_DURATION = 0.3
+# How far before the target segment length a silence may be to be used as the cut point
+SEARCH_WINDOW = 30
+
+silence_start_re = re.compile(r' silence_start: (?P<start>-?[0-9]+(\.?[0-9]*))')
+silence_end_re = re.compile(r' silence_end: (?P<end>[0-9]+(\.?[0-9]*)) ')
+
+
+def detect_silences(audio_path, silence_threshold=SILENCE_THRESHOLD, silence_duration=SILENCE_DURATION):
+    """Run a single ffmpeg silencedetect pass and return the (start, end) times of every silence.
+
+    ffmpeg's report is parsed line by line as it streams in, so memory use doesn't depend on input length.
+    """
+    # Only the first audio stream is decoded; a video stream would be decoded for nothing
+    cmd = ["./" + FFMPEG_PATH, "-nostats", "-i", audio_path, "-map", "0:a:0", "-vn",
+           "-af", f"silencedetect=n={silence_threshold}dB:d={silence_duration}", "-f", "null", "-"]
+    logging.debug(f"cmd: {subprocess.list2cmdline(cmd)}")
+
+    silences = []
+    silence_start = None
+    process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    for line in process.stderr:
+        silence_start_match = silence_start_re.search(line)
+        silence_end_match = silence_end_re.search(line)
+        if silence_start_match:
+            silence_start = max(0.0, float(silence_start_match.group('start')))
+        elif silence_end_match and silence_start is not None:
+            silences.append((silence_start, float(silence_end_match.group('end'))))
+            silence_start = None
+
+    if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg silencedetect failed with exit code {process.returncode}")
+    return silences
+
+
+def fixed_boundaries(duration, segment_length):
+    """Cut `duration` seconds into consecutive (start, end) segments of at most `segment_length`."""
+    boundaries = []
+    start = 0.0
+    while start < duration:
+        end = min(start + segment_length, duration)
+        boundaries.append((start, end))
+        start = end
+    return boundaries
+
+
+def choose_boundaries(silences, duration, segment_length, search_window=SEARCH_WINDOW):
+    """Pick cut points in the middle of silences close to, but not past, each target segment length.
+
+    Where no silence falls inside the search window the segment is cut at the target length.
+    """
+    boundaries = []
+    start = 0.0
+    while duration - start > segment_length:
+        target = start + segment_length
+        candidates = [
+            (silence_start + silence_end) / 2
+            for silence_start, silence_end in silences
+            if max(start, target - search_window) < (silence_start + silence_end) / 2 <= target
+        ]
+        cut = max(candidates) if candidates else target
+        boundaries.append((start, cut))
+        start = cut
+    boundaries.append((start, duration))
+    return boundaries
+
+
+def silence_aware_boundaries(audio_path, duration, segment_length):
+    """Return (start, end) segments of at most `segment_length` seconds that end in silence where possible."""
+    try:
+        silences = detect_silences(audio_path)
+    except (OSError, RuntimeError) as e:
+        logging.warning(f"Silence detection failed, using fixed-length segments: {e}")
+        return fixed_boundaries(duration, segment_length)
+
+    boundaries = choose_boundaries(silences, duration, segment_length)
+    logging.info(f"Found {len(silences)} silences, cutting audio into {len(boundaries)} segments")
+    return boundaries
@@ -1,28 +1,203 @@
 import logging
-import requests
+import importlib.util
+import os
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 
-OLLAMA_BASE_URL = "http://localhost:11434"
-OLLAMA_MODEL = "mistral"  # smallest model for this usecase
+from utils.ollama_helper import get_client
+from utils.token_counter import token_counter
 
-def generate_with_ollama(prompt):
-    """Send a request to the local Ollama server to generate a response."""
-    url = f"{OLLAMA_BASE_URL}/api/generate"
-    data = {
-        "model": OLLAMA_MODEL,
-        "prompt": prompt,
-        "stream": False
-    }
+ERROR_SUMMARY = "Error during summarization."
+
+# Backend chosen when a job doesn't ask for one: Ollama, falling back to the extractive summarizer
+DEFAULT_SUMMARIZER = "auto"
+# Seconds an Ollama summary may take before the extractive summary is used instead (unset: no limit)
+SUMMARY_LATENCY_BUDGET = float(os.environ.get("AVS_SUMMARY_LATENCY_BUDGET", "0")) or None
+
+# Context window requested from Ollama and the part of it reserved for the generated summary.
+# Transcripts whose prompt doesn't fit in the rest are summarized map-reduce style.
+NUM_CTX = 4096
+SUMMARY_MAX_TOKENS = 512
+
+# Requests kept in flight at once; match the server's OLLAMA_NUM_PARALLEL so none wait in its queue
+OLLAMA_CONCURRENCY = int(os.environ.get("OLLAMA_NUM_PARALLEL", "4"))
+GENERATE_OPTIONS = {"num_ctx": NUM_CTX, "num_predict": SUMMARY_MAX_TOKENS}
+
+# Local seq2seq model used by the "transformer" backend, its input window and summary length (tokens)
+SEQ2SEQ_MODEL = os.environ.get("AVS_SEQ2SEQ_MODEL", "sshleifer/distilbart-cnn-12-6")
+SEQ2SEQ_MAX_INPUT_TOKENS = 1024
+SEQ2SEQ_MAX_SUMMARY_TOKENS = 142
+# Chunks summarized per forward pass, and torch threads (unset: the cores this process may use)
+SEQ2SEQ_BATCH_SIZE = int(os.environ.get("AVS_SEQ2SEQ_BATCH_SIZE", "8"))
+SEQ2SEQ_THREADS = int(os.environ.get("AVS_SEQ2SEQ_THREADS", "0")) or None
+
+# This process's share of OLLAMA_CONCURRENCY when several worker processes talk to one server
+_ollama_concurrency = None
+
+_seq2seq = None
+_seq2seq_lock = threading.Lock()
+
+SUMMARY_PROMPT = "Summarize the following transcription into a concise paragraph:\n\n{text}"
+CHUNK_PROMPT = "Summarize the following part of a longer transcription into a concise paragraph:\n\n{text}"
+REDUCE_PROMPT = ("Combine the following summaries of consecutive parts of one transcription "
+                 "into a single concise paragraph:\n\n{text}")
+
+def generate_with_ollama(prompt, deadline=None):
+    """Send a request to the local Ollama server to generate a response.
+
+    With `deadline` (a time.monotonic() value) the request is cancelled once it passes.
+    """
+    import requests
 
     try:
-        response = requests.post(url, json=data)
-        response.raise_for_status()
-        return response.json().get("response", "").strip()
+        body = get_client().generate(prompt, GENERATE_OPTIONS, deadline)
+        token_counter.calibrate(prompt, body.get("prompt_eval_count"))
+        return body.get("response", "").strip()
     except requests.exceptions.RequestException as e:
         logging.error(f"Error connecting to Ollama: {e}")
-        return "Error during summarization."
+        return ERROR_SUMMARY
+
+def stream_with_ollama(prompt, on_token=None):
+    """Generate a response with Ollama's streaming API, passing each token to `on_token` as it arrives.
+
+    Tokens are written to stdout when no callback is given. Time to first token and generation
+    speed are logged once the response completes.
+    """
+    import requests
+
+    if on_token is None:
+        on_token = lambda token: (sys.stdout.write(token), sys.stdout.flush())
+
+    started_at = time.monotonic()
+    first_token_at = None
+    parts = []
+    try:
+        for chunk in get_client().stream(prompt, GENERATE_OPTIONS):
+            token = chunk.get("response", "")
+            if token:
+                if first_token_at is None:
+                    first_token_at = time.monotonic()
+                parts.append(token)
+                on_token(token)
+            if chunk.get("done"):
+                token_counter.calibrate(prompt, chunk.get("prompt_eval_count"))
+                _log_stream_stats(started_at, first_token_at, chunk)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logging.error(f"Error connecting to Ollama: {e}")
+        if not parts:
+            on_token(ERROR_SUMMARY)
+        return ERROR_SUMMARY
+
+    return "".join(parts).strip()
+
+def _log_stream_stats(started_at, first_token_at, final_chunk):
+    elapsed = time.monotonic() - started_at
+    time_to_first_token = (first_token_at - started_at) if first_token_at else elapsed
+    eval_count = final_chunk.get("eval_count")
+    eval_duration = final_chunk.get("eval_duration")  # nanoseconds
+    tokens_per_second = eval_count / (eval_duration / 1e9) if eval_count and eval_duration else 0.0
+    logging.info(f"Summary streamed: first token after {time_to_first_token * 1000:.0f} ms, "
+                 f"{eval_count or 0} tokens at {tokens_per_second:.1f} tokens/s, {elapsed:.2f} s total")
 
-def summarize_transcription(transcription_data):
-    """Summarize the transcription data text into a concise, meaningful summary using Ollama."""
+def set_ollama_concurrency(requests):
+    """Limit the Ollama requests this process keeps in flight, e.g. to its share of the server's slots."""
+    global _ollama_concurrency
+    _ollama_concurrency = max(1, requests)
+
+def generate_all(prompts, concurrency=None, deadline=None):
+    """Generate a response for every independent prompt, keeping at most `concurrency` requests in flight.
+
+    Responses are returned in prompt order. Requests still running at `deadline` are cancelled.
+    """
+    concurrency = concurrency or _ollama_concurrency or OLLAMA_CONCURRENCY
+    if len(prompts) <= 1 or concurrency <= 1:
+        return [generate_with_ollama(prompt, deadline) for prompt in prompts]
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(prompts))) as executor:
+        return list(executor.map(lambda prompt: generate_with_ollama(prompt, deadline), prompts))
+
+def prompt_budget(template):
+    """Tokens of transcript text that fit in `template` without exceeding the context window."""
+    return NUM_CTX - SUMMARY_MAX_TOKENS - token_counter.count(template.format(text=""))
+
+def pack_texts(texts, budget, count=None):
+    """Greedily group consecutive texts into chunks of at most `budget` tokens.
+
+    A single text larger than the budget is split between words on its own.
+    Tokens are counted with `count`, by default the summarization model's token counter.
+    """
+    count = count or token_counter.count
+    chunks = []
+    current = []
+    current_tokens = 0
+    for text in texts:
+        tokens = count(text) + 1
+        if tokens > budget:
+            if current:
+                chunks.append(" ".join(current))
+                current, current_tokens = [], 0
+            chunks.extend(pack_texts(text.split(" "), budget, count) if " " in text.strip() else [text])
+            continue
+        if current and current_tokens + tokens > budget:
+            chunks.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+def reduce_summaries(summaries, on_token=None, deadline=None):
+    """Combine partial summaries, recursively, until a single summary remains.
+
+    With `on_token`, the final combining request is streamed to it. Requests are cancelled at `deadline`.
+    """
+    budget = prompt_budget(REDUCE_PROMPT)
+    while len(summaries) > 1:
+        groups = _pack_summaries(summaries, budget)
+        logging.info(f"Reducing {len(summaries)} partial summaries in {len(groups)} prompts")
+        prompts = [REDUCE_PROMPT.format(text="\n\n".join(group)) for group in groups]
+        if len(prompts) == 1 and on_token is not None:
+            return stream_with_ollama(prompts[0], on_token)
+        summaries = generate_all(prompts, deadline=deadline)
+        if ERROR_SUMMARY in summaries:
+            break
+
+    summary = ERROR_SUMMARY if ERROR_SUMMARY in summaries else summaries[0]
+    if on_token is not None:
+        on_token(summary)
+    return summary
+
+def _pack_summaries(summaries, budget, count=None):
+    """Group summaries for a reduce round, always at least two per group so every round shrinks."""
+    count = count or token_counter.count
+    groups = []
+    current = []
+    current_tokens = 0
+    for summary in summaries:
+        tokens = count(summary) + 2
+        if len(current) >= 2 and current_tokens + tokens > budget:
+            groups.append(current)
+            current, current_tokens = [], 0
+        current.append(summary)
+        current_tokens += tokens
+    if current:
+        if len(current) == 1 and groups:
+            groups[-1].append(current[0])
+        else:
+            groups.append(current)
+    return groups
+
+def summarize_with_ollama(transcription_data, on_token=None, deadline=None):
+    """Summarize the transcription data text into a concise, meaningful summary using Ollama.
+
+    Transcripts that don't fit in one prompt are split at segment boundaries into chunks that are
+    summarized independently (map), and the chunk summaries are then combined (reduce).
+    With `on_token`, the final summary is streamed to it as it is generated. Without it, requests
+    still running at `deadline` (a time.monotonic() value) are cancelled and ERROR_SUMMARY is returned.
+    """
     if not transcription_data:
         logging.error(f"Argument \"transcription_data\" was {transcription_data}")
         return ""
@@ -31,6 +206,202 @@ def summarize_transcription(transcription_data):
     full_text = " ".join([entry['text'] for entry in transcription_data])
 
     # Define the summarization prompt
-    prompt = f"Summarize the following transcription into a concise paragraph:\n\n{full_text}"
+    prompt = SUMMARY_PROMPT.format(text=full_text)
+    prompt_tokens = token_counter.count(prompt)
+    if prompt_tokens <= NUM_CTX - SUMMARY_MAX_TOKENS:
+        if on_token is not None:
+            return stream_with_ollama(prompt, on_token)
+        return generate_with_ollama(prompt, deadline)
+
+    chunks = pack_texts([entry['text'] for entry in transcription_data], prompt_budget(CHUNK_PROMPT))
+    logging.info(f"Transcript prompt is ~{prompt_tokens} tokens, summarizing it in {len(chunks)} chunks")
+    summaries = generate_all([CHUNK_PROMPT.format(text=chunk) for chunk in chunks], deadline=deadline)
+    if ERROR_SUMMARY in summaries:
+        if on_token is not None:
+            on_token(ERROR_SUMMARY)
+        return ERROR_SUMMARY
+    return reduce_summaries(summaries, on_token, deadline)
+
+def load_seq2seq():
+    """Return the process-wide (tokenizer, model) pair of the local seq2seq model, loading it on first use."""
+    global _seq2seq
+    with _seq2seq_lock:
+        if _seq2seq is None:
+            import torch
+            from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+            from utils.transcriber import available_cores
+
+            # Stay within this process's share of the CPUs, like whisper.cpp does
+            torch.set_num_threads(SEQ2SEQ_THREADS or available_cores())
+            started_at = time.monotonic()
+            tokenizer = AutoTokenizer.from_pretrained(SEQ2SEQ_MODEL)
+            model = AutoModelForSeq2SeqLM.from_pretrained(SEQ2SEQ_MODEL).eval()
+            logging.info(f"Loaded {SEQ2SEQ_MODEL} in {time.monotonic() - started_at:.2f} s "
+                         f"using {torch.get_num_threads()} threads")
+            _seq2seq = (tokenizer, model)
+        return _seq2seq
+
+def summarize_batch(texts, batch_size=None):
+    """Summarize independent texts with the local seq2seq model, several per padded forward pass.
+
+    Summaries are returned in input order.
+    """
+    import torch
+
+    tokenizer, model = load_seq2seq()
+    batch_size = batch_size or SEQ2SEQ_BATCH_SIZE
+    summaries = [None] * len(texts)
+    # Batching texts of similar length keeps the padding small
+    order = sorted(range(len(texts)), key=lambda index: len(texts[index]))
+    for start in range(0, len(order), batch_size):
+        indices = order[start:start + batch_size]
+        inputs = tokenizer([texts[index] for index in indices], padding=True, truncation=True,
+                           max_length=SEQ2SEQ_MAX_INPUT_TOKENS, return_tensors="pt")
+        with torch.inference_mode():
+            outputs = model.generate(**inputs, max_new_tokens=SEQ2SEQ_MAX_SUMMARY_TOKENS)
+        for index, summary in zip(indices, tokenizer.batch_decode(outputs, skip_special_tokens=True)):
+            summaries[index] = summary.strip()
+    return summaries
+
+def summarize_with_transformer(transcription_data):
+    """Summarize the transcription data with the local seq2seq model.
+
+    Long transcripts are split into chunks that fit the model's input, summarized in batches (map),
+    and the chunk summaries are combined in batched rounds until one remains (reduce).
+    """
+    if not transcription_data:
+        logging.error(f"Argument \"transcription_data\" was {transcription_data}")
+        return ""
+
+    tokenizer, _ = load_seq2seq()
+    count = lambda text: len(tokenizer.encode(text, add_special_tokens=False))
+    # Room for the special tokens the tokenizer adds around each input
+    budget = SEQ2SEQ_MAX_INPUT_TOKENS - tokenizer.num_special_tokens_to_add()
+
+    chunks = pack_texts([entry['text'] for entry in transcription_data], budget, count)
+    logging.info(f"Summarizing {len(chunks)} chunks with {SEQ2SEQ_MODEL}")
+    summaries = summarize_batch(chunks)
+    while len(summaries) > 1:
+        groups = _pack_summaries(summaries, budget, count)
+        logging.info(f"Reducing {len(summaries)} partial summaries in {len(groups)} batched inputs")
+        summaries = summarize_batch([" ".join(group) for group in groups])
+    return summaries[0]
+
+
+class SummarizerBackend(ABC):
+    """
+    Abstract base class for summarizer backends.
+    Each backend turns transcription data into a summary string.
+    """
+    name = None
+
+    @abstractmethod
+    def summarize(self, transcription_data, on_token=None):
+        """
+        Returns the summary of the transcription data. With `on_token`, the summary is also passed to it,
+        token by token where the backend generates it incrementally.
+        """
+        pass
+
+    def is_available(self):
+        """Whether the backend can summarize right now."""
+        return True
+
+
+class OllamaSummarizer(SummarizerBackend):
+    name = "ollama"
+
+    def summarize(self, transcription_data, on_token=None, deadline=None):
+        return summarize_with_ollama(transcription_data, on_token, deadline)
+
+    def is_available(self):
+        from utils.ollama_helper import is_ollama_running
+        return is_ollama_running()
+
+
+class ExtractiveSummarizer(SummarizerBackend):
+    """Picks the most central sentences of the transcript (LexRank); needs no model or server."""
+    name = "extractive"
+
+    def summarize(self, transcription_data, on_token=None):
+        from utils.extractive_summarizer import summarize_extractive
+
+        started_at = time.monotonic()
+        summary = summarize_extractive(transcription_data) if transcription_data else ""
+        logging.info(f"Extractive summary ready in {(time.monotonic() - started_at) * 1000:.0f} ms")
+        if on_token is not None:
+            on_token(summary)
+        return summary
+
+
+class TransformerSummarizer(SummarizerBackend):
+    """Summarizes with a local seq2seq model on the CPU; needs no server."""
+    name = "transformer"
+
+    def summarize(self, transcription_data, on_token=None):
+        try:
+            summary = summarize_with_transformer(transcription_data)
+        except ImportError as e:
+            logging.error(f"Local summarization needs torch and transformers: {e}")
+            summary = ERROR_SUMMARY
+        except (OSError, RuntimeError, ValueError) as e:
+            logging.error(f"Local summarization with {SEQ2SEQ_MODEL} failed: {e}")
+            summary = ERROR_SUMMARY
+        if on_token is not None:
+            on_token(summary)
+        return summary
+
+    def is_available(self):
+        return all(importlib.util.find_spec(module) for module in ("torch", "transformers"))
+
+
+SUMMARIZER_BACKENDS = {
+    backend.name: backend for backend in (OllamaSummarizer, ExtractiveSummarizer, TransformerSummarizer)
+}
+
+
+def uses_ollama(backend):
+    """Whether summaries with the named backend may be requested from Ollama."""
+    return (backend or DEFAULT_SUMMARIZER) in ("auto", OllamaSummarizer.name)
+
+
+def summarize_transcription(transcription_data, on_token=None, backend=None, latency_budget=None, keep_lines=None):
+    """Summarize the transcription data with the named backend.
+
+    The transcript is first stripped of non-speech markers and repeated lines and, with `keep_lines`,
+    reduced to its most salient lines. The default "auto" backend uses Ollama and falls back to the
+    extractive summarizer when the server isn't reachable, fails, or (without `on_token`) takes longer
+    than `latency_budget` seconds.
+    """
+    from utils.transcript_filter import filter_transcript
+
+    backend = backend or DEFAULT_SUMMARIZER
+    # Only Ollama's prompts are sized with the tokenizer; other backends make do with the estimate
+    transcription_data = filter_transcript(transcription_data or [], keep_lines,
+                                           token_counter.count if uses_ollama(backend) else None)
+    if backend != "auto":
+        if backend not in SUMMARIZER_BACKENDS:
+            raise ValueError(f"Unknown summarizer backend: {backend}")
+        return SUMMARIZER_BACKENDS[backend]().summarize(transcription_data, on_token)
+
+    primary, fallback = OllamaSummarizer(), ExtractiveSummarizer()
+    if not primary.is_available():
+        logging.warning("Ollama is not reachable, using the extractive summarizer.")
+        return fallback.summarize(transcription_data, on_token)
+
+    latency_budget = latency_budget or SUMMARY_LATENCY_BUDGET
+    if on_token is not None or not latency_budget:
+        # A streamed summary is already visible as it is generated, so it isn't cut short
+        summary = primary.summarize(transcription_data, on_token)
+    else:
+        # Requests still running when the budget runs out are cancelled, freeing the server's slots
+        deadline = time.monotonic() + latency_budget
+        summary = primary.summarize(transcription_data, deadline=deadline)
+        if summary == ERROR_SUMMARY and time.monotonic() >= deadline:
+            logging.warning(f"Ollama exceeded the {latency_budget:g} s latency budget, using the extractive summarizer.")
+            return fallback.summarize(transcription_data)
 
-    return generate_with_ollama(prompt)
+    if summary == ERROR_SUMMARY and on_token is None:
+        logging.warning("Ollama summarization failed, using the extractive summarizer.")
+        return fallback.summarize(transcription_data)
+    return summary
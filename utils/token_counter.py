@@ -0,0 +1,83 @@
+import logging
+import math
+import os
+import threading
+
+# A tokenizer.json for the summarization model, used without network access
+TOKENIZER_PATH = os.environ.get("AVS_TOKENIZER_PATH", os.path.join(os.path.expanduser("~"), ".avs", "tokenizer.json"))
+# Looked up in the local Hugging Face cache when no tokenizer.json is configured
+TOKENIZER_MODEL_ID = "mistralai/Mistral-7B-Instruct-v0.2"
+
+# Estimate used without a tokenizer, refined from the prompt token counts Ollama reports
+DEFAULT_CHARS_PER_TOKEN = 3.5
+MIN_CHARS_PER_TOKEN = 2.0
+MAX_CHARS_PER_TOKEN = 6.0
+CALIBRATION_WEIGHT = 0.2
+
+
+class TokenCounter:
+    """
+    Counts tokens with an offline tokenizer when one is available, and otherwise estimates them
+    from a characters-per-token ratio calibrated against the counts reported by the server.
+    """
+    def __init__(self, tokenizer_path=TOKENIZER_PATH, model_id=TOKENIZER_MODEL_ID):
+        self.tokenizer_path = tokenizer_path
+        self.model_id = model_id
+        self.chars_per_token = DEFAULT_CHARS_PER_TOKEN
+        self._encode = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            try:
+                tokenizer_path = self.tokenizer_path if os.path.exists(self.tokenizer_path) else self._cached_tokenizer()
+                if tokenizer_path is None:
+                    logging.info("No local tokenizer available, estimating token counts.")
+                    return
+                from tokenizers import Tokenizer
+
+                tokenizer = Tokenizer.from_file(tokenizer_path)
+                self._encode = lambda text: tokenizer.encode(text, add_special_tokens=False).ids
+                logging.info("Counting summarization tokens with the local tokenizer.")
+            except Exception as e:
+                logging.info(f"No local tokenizer available, estimating token counts: {e}")
+
+    def _cached_tokenizer(self):
+        """Return the model's tokenizer.json from the local Hugging Face cache, or None if it isn't there."""
+        # A cache lookup only: importing transformers to ask the same would take seconds per process
+        from huggingface_hub import try_to_load_from_cache
+
+        path = try_to_load_from_cache(self.model_id, "tokenizer.json")
+        return path if isinstance(path, str) else None
+
+    @property
+    def exact(self):
+        """Whether counts come from a real tokenizer rather than the estimate."""
+        self._load()
+        return self._encode is not None
+
+    def count(self, text):
+        """Return the number of tokens in `text`."""
+        self._load()
+        if self._encode is not None:
+            return len(self._encode(text))
+        return self.estimate(text)
+
+    def estimate(self, text):
+        """Estimate the number of tokens in `text` from its length, without loading a tokenizer."""
+        return math.ceil(len(text) / self.chars_per_token)
+
+    def calibrate(self, text, token_count):
+        """Refine the characters-per-token estimate with a token count measured by the server."""
+        if self._encode is not None or not token_count or not text:
+            return
+        observed = min(max(len(text) / token_count, MIN_CHARS_PER_TOKEN), MAX_CHARS_PER_TOKEN)
+        with self._lock:
+            self.chars_per_token += CALIBRATION_WEIGHT * (observed - self.chars_per_token)
+
+
+token_counter = TokenCounter()
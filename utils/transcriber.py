@@ -1,13 +1,36 @@
+import io
 import logging
 import wave
 import os
 import subprocess
 import re
-from utils.ffmpeg_helper import validate_media_duration
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from utils import whisper_bindings, whisper_server
+from utils.whisper_paths import WHISPER_BINARY_PATH, WHISPER_MODEL_PATH
+from utils.audio_extractor import SUPPORTED_VIDEO_FORMATS, WHISPER_SAMPLE_RATE, pcm_stream
+from utils.ffmpeg_helper import get_media_duration
+from utils.segmenter import silence_aware_boundaries
 
 ffmpeg_binary_path = os.path.join("third-party", "ffmpeg", "ffmpeg")
-print(f"Using ffmpeg binary at: {ffmpeg_binary_path}")
-os.environ['FFMPEG_BINARY'] = ffmpeg_binary_path
+
+# Threads used by each whisper.cpp process; job executors size their pools from this
+WHISPER_THREADS = 4
+# Longer audio is transcribed in segments of at most this many seconds, cut in silences where possible
+SEGMENT_LENGTH = 300
+# Extra seconds transcribed past each segment end so words on a cut aren't lost
+SEGMENT_OVERLAP = 1.0
+
+# "library" transcribes in this process through libwhisper, loading the model once; "server" sends
+# audio to a whisper.cpp server kept up during batches and daemon runs; "cli" runs the main binary
+# for every file or segment; "auto" uses the library once it has been built, otherwise a server
+WHISPER_ENGINE = os.environ.get("AVS_WHISPER_ENGINE", "auto")
+
+# Cores transcriptions in this process may use; None means all of them
+_cpu_budget = None
+# Set once loading libwhisper failed, so "auto" stops retrying it
+_library_failed = False
 
 def is_audio_file_supported(audio_path):
     """Check if the file is a supported audio format."""
@@ -15,65 +38,238 @@ def is_audio_file_supported(audio_path):
     _, ext = os.path.splitext(audio_path)
     return ext.lower() in supported_formats
 
-def convert_to_wav(audio_path):
-    """Convert the given audio file to WAV format using FFmpeg."""
-    output_path = os.path.splitext(audio_path)[0] + ".wav"
+def transcribe_audio(audio_path):
+    """Transcribe audio to text using whisper.cpp.
+
+    Audio longer than SEGMENT_LENGTH seconds is split into segments that are transcribed by
+    concurrent whisper.cpp processes and stitched back together onto the original timeline.
+    """
+    logging.info(f"Transcribing audio file: {audio_path}")
+    logging.debug(f"Using ffmpeg binary at: {ffmpeg_binary_path}")
+    os.environ['FFMPEG_BINARY'] = ffmpeg_binary_path
+
+    if not audio_path:
+        return None
+    if not is_audio_file_supported(audio_path) and os.path.splitext(audio_path)[1].lower() not in SUPPORTED_VIDEO_FORMATS:
+        logging.error("Invalid file format: Supported formats are .wav, .mp3, .aac, .flac, .ogg, .m4a and video files")
+        return None
+
+    duration = get_wav_duration(audio_path) if is_whisper_wav(audio_path) else get_media_duration(audio_path)
+    if duration is None:
+        logging.error(f"Unable to read the duration of {audio_path}")
+        return None
+    if duration <= SEGMENT_LENGTH:
+        return run_whisper(audio_path, min(WHISPER_THREADS, available_cores()))
+
+    logging.info(f"Audio is {duration / 60:.2f} minutes long, transcribing in {SEGMENT_LENGTH} second segments")
+    return transcribe_segments(audio_path, silence_aware_boundaries(audio_path, duration, SEGMENT_LENGTH))
+
+def set_cpu_budget(cores):
+    """Limit the cores this process's transcriptions may use, e.g. when several jobs share a host.
+
+    `None` lifts the limit. Returns the previous budget so it can be restored.
+    """
+    global _cpu_budget
+    previous, _cpu_budget = _cpu_budget, None if cores is None else max(1, cores)
+    return previous
+
+def available_cores():
+    return _cpu_budget or os.cpu_count() or 1
+
+def transcribe_segments(audio_path, boundaries):
+    """Transcribe (start, end) segments of an audio or video file in parallel and stitch them in order.
+
+    Workers and whisper.cpp threads per worker are sized so that together they fit the available cores.
+    """
+    cores = available_cores()
+    workers = min(len(boundaries), max(1, cores // WHISPER_THREADS))
+    threads = max(1, cores // workers)
+    logging.info(f"Transcribing {len(boundaries)} segments with {workers} whisper.cpp processes of {threads} threads")
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_transcribe_segment, audio_path, index, start, end, threads)
+            for index, (start, end) in enumerate(boundaries)
+        ]
+        segment_transcriptions = [future.result() for future in futures]
+
+    if any(transcription is None for transcription in segment_transcriptions):
+        logging.error("Transcription of one or more segments failed.")
+        return None
+    return stitch_segments(segment_transcriptions)
+
+def _transcribe_segment(audio_path, index, start, end, threads):
+    """Transcribe one segment (plus SEGMENT_OVERLAP) of the input and rebase it onto the original timeline."""
+    transcription = run_whisper(audio_path, threads, start=start, duration=end - start + SEGMENT_OVERLAP)
+    if transcription is None:
+        logging.error(f"Failed to transcribe segment {index} ({start:.1f}s - {end:.1f}s)")
+        return None
+    return shift_timestamps(transcription, start)
+
+def stitch_segments(segment_transcriptions):
+    """Merge rebased segment transcriptions in order, dropping lines repeated where segments overlap."""
+    stitched = []
+    for transcription in segment_transcriptions:
+        covered_until = parse_timestamp(stitched[-1]["timestamp"].split(" --> ")[1]) if stitched else 0
+        for entry in transcription:
+            start, end = (parse_timestamp(t) for t in entry["timestamp"].split(" --> "))
+            if stitched and end <= covered_until:
+                # Entirely inside audio the previous segment already transcribed
+                continue
+            if stitched and start < covered_until and _normalize_text(entry["text"]) in _normalize_text(stitched[-1]["text"]):
+                continue
+            stitched.append(entry)
+    return stitched
+
+def _normalize_text(text):
+    return re.sub(r"[^a-z0-9 ]", "", text.lower()).strip()
+
+def whisper_model():
+    """Return the in-process whisper.cpp model, or None when transcription should run the main binary."""
+    global _library_failed
+    if WHISPER_ENGINE == "cli" or _library_failed:
+        return None
+    if WHISPER_ENGINE == "auto" and not whisper_bindings.is_available():
+        return None
     try:
-        subprocess.run(
-            ["ffmpeg", "-i", audio_path, output_path],
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        logging.info(f"File converted to WAV: {output_path}")
-        return output_path
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Error converting {audio_path} to WAV: {e}")
+        return whisper_bindings.get_model()
+    except (OSError, RuntimeError) as e:
+        if WHISPER_ENGINE == "library":
+            raise
+        logging.warning(f"Unable to load libwhisper, running the whisper.cpp binary instead: {e}")
+        _library_failed = True
         return None
 
+def whisper_server_wanted():
+    """Whether batches and the daemon should keep a whisper.cpp server up for transcription."""
+    if WHISPER_ENGINE == "server":
+        return True
+    return WHISPER_ENGINE == "auto" and not whisper_bindings.is_available() and whisper_server.is_available()
 
-def transcribe_audio(audio_path):
-    """Transcribe audio to text using whisper.cpp."""
-    logging.info(f"Transcribing audio file: {audio_path}")
+@contextmanager
+def whisper_server_running():
+    """Keep a whisper.cpp server with the model loaded for the duration of a batch or daemon run.
 
-    # Validate that the file is a .wav file
-    if not audio_path.endswith('.wav'):
-        # If not then check if it's an ffmpeg supported audio file
-        if not is_audio_file_supported(audio_path):
-            logging.error("Invalid file format: Supported formats are .wav, .mp3, .aac, .flac, .ogg, and .m4a")
-            return None
-        # If it is supported then convert "any" audio file into .wav file.
-        audio_path = convert_to_wav(audio_path)
-        if not audio_path:
-            logging.error("Failed to convert audio file to WAV format.")
-            return None
+    Does nothing when transcription doesn't use a server; if the server can't be started,
+    transcription falls back to the main binary. Servers that were already up, e.g. the daemon's
+    when a batch runs inside it, are left running.
+    """
+    if not whisper_server_wanted():
+        yield
+        return
+    try:
+        _, started = whisper_server.start_server()
+    except (OSError, RuntimeError) as e:
+        logging.warning(f"Unable to start a whisper.cpp server, running the whisper.cpp binary instead: {e}")
+        yield
+        return
+    try:
+        yield
+    finally:
+        if started:
+            whisper_server.stop_server()
 
-    # Checking if the duration of audio/video is less than or equal to 5 minutes
-    validate_media_duration(audio_path)
+def run_whisper(audio_path, threads=WHISPER_THREADS, start=None, duration=None):
+    """Run whisper.cpp on an audio or video file and return its timestamped segments.
 
-    logging.info(f"Validating Sample Rate...")
-    # Validate the sample rate is 16 kHz
-    if not is_16khz_wav(audio_path):
-        try:
-            audio_path = convert_to_16khz(audio_path)
-        except Exception as e:
-            logging.error(f"Failed to convert audio to 16 kHz: {e}")
-            return None
+    With `start`/`duration` (seconds) only that part of the file is transcribed. When libwhisper is
+    available the audio is transcribed in this process; otherwise it is sent to the whisper.cpp
+    server if one is up, and failing that transcribed by the main binary: a 16 kHz mono .wav is
+    read by it directly, anything else is decoded by ffmpeg and piped into its stdin.
+    """
+    model = whisper_model()
+    if model is not None:
+        return run_whisper_in_process(model, audio_path, threads, start, duration)
 
-    # Path to the built whisper.cpp binary
-    whisper_path = "third-party/whisper.cpp/main"
-    model_path = "third-party/whisper.cpp/models/ggml-base.en.bin"
+    server = whisper_server.get_server() if WHISPER_ENGINE in ("auto", "server") else None
+    if server is not None:
+        transcription = run_whisper_on_server(server, audio_path, start, duration)
+        if transcription is not None:
+            return transcription
+        logging.warning("Falling back to the whisper.cpp binary")
 
     logging.info("Starting Transcription")
-    logging.debug(f"cmd: {whisper_path} -m {model_path} -f {audio_path}")
+    piped = start is not None or duration is not None or not is_whisper_wav(audio_path)
+    cmd = ["./" + WHISPER_BINARY_PATH, "-m", WHISPER_MODEL_PATH, "-t", str(threads), "-f", "-" if piped else audio_path]
+    logging.debug(f"cmd: {subprocess.list2cmdline(cmd)}")
 
-    result = subprocess.run(["./" + whisper_path, "-m", model_path, "-f", audio_path], capture_output=True, text=True)
+    if not piped:
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        returncode, transcription, errors = result.returncode, result.stdout, result.stderr
+    else:
+        decoder = pcm_stream(audio_path, start, duration)
+        whisper = subprocess.Popen(cmd, stdin=decoder.stdout, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        # whisper.cpp now holds the only reading end, so ffmpeg sees a broken pipe if it exits early
+        decoder.stdout.close()
+        transcription, errors = whisper.communicate()
+        returncode = whisper.returncode
+        decoder_errors = decoder.stderr.read().decode(errors="replace").strip()
+        if decoder.wait() != 0:
+            logging.error(f"Decoding {audio_path} failed: {decoder_errors}")
+            return None
 
-    if result.returncode != 0:
-        logging.error("Transcription failed: " + result.stderr)
+    if returncode != 0:
+        logging.error("Transcription failed: " + errors)
         return None
 
-    transcription = result.stdout.strip()
+    return parse_whisper_output(transcription)
+
+def run_whisper_in_process(model, audio_path, threads, start=None, duration=None):
+    """Decode the audio to float32 samples in memory and transcribe them with the loaded model."""
+    import numpy as np
+
+    logging.info("Starting Transcription in process")
+    decoder = pcm_stream(audio_path, start, duration, output_format="f32le")
+    pcm, decoder_errors = decoder.communicate()
+    if decoder.returncode != 0:
+        logging.error(f"Decoding {audio_path} failed: {decoder_errors.decode(errors='replace').strip()}")
+        return None
+
+    # A read-only view of ffmpeg's output, passed on to whisper.cpp without a copy
+    samples = np.frombuffer(pcm, dtype="<f4")
+    try:
+        segments = model.transcribe(samples, threads)
+    except RuntimeError as e:
+        logging.error(f"Transcription failed: {e}")
+        return None
+    return _timestamped_segments(segments)
+
+def run_whisper_on_server(server, audio_path, start=None, duration=None):
+    """Decode the audio to a .wav in memory and transcribe it on a whisper.cpp server."""
+    import requests
+
+    logging.info("Starting Transcription on the whisper.cpp server")
+    decoder = pcm_stream(audio_path, start, duration, output_format="s16le")
+    pcm, decoder_errors = decoder.communicate()
+    if decoder.returncode != 0:
+        logging.error(f"Decoding {audio_path} failed: {decoder_errors.decode(errors='replace').strip()}")
+        return None
+
+    # The server only accepts a .wav whose header carries the real sizes, which a piped one can't
+    wav_data = io.BytesIO()
+    with wave.open(wav_data, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(WHISPER_SAMPLE_RATE)
+        wav_file.writeframes(pcm)
+
+    try:
+        segments = server.transcribe(wav_data.getvalue())
+    except (requests.exceptions.RequestException, RuntimeError, ValueError) as e:
+        logging.error(f"whisper.cpp server transcription failed: {e}")
+        return None
+    return _timestamped_segments(segments)
+
+def _timestamped_segments(segments):
+    """Convert (start ms, end ms, text) segments into the {"timestamp", "text"} entries of the CLI output."""
+    return [
+        {"timestamp": f"{format_timestamp(start_ms)} --> {format_timestamp(end_ms)}", "text": text}
+        for start_ms, end_ms, text in segments
+    ]
+
+def parse_whisper_output(output):
+    """Parse whisper.cpp's timestamped console output into {"timestamp", "text"} segments."""
+    transcription = output.strip()
 
     # Validate that transcription is not empty and has time-stamped lines
     if not transcription:
@@ -98,32 +294,40 @@ def transcribe_audio(audio_path):
     # If you want to return the structured transcription (timestamp + text)
     return timestamped_transcription
 
-def is_16khz_wav(audio_path):
-    """Check if a .wav file has a 16 kHz sampling rate."""
-    logging.info(f"Checking if a .wav file has a 16 kHz sampling rate.")
-    try:
-        with wave.open(audio_path, 'rb') as wav_file:
-            sample_rate = wav_file.getframerate()
-            logging.info(f"Current Sample Rate: {sample_rate}")
-            return sample_rate == 16000
-    except wave.Error as e:
-        logging.error(f"Error reading .wav file: {e}")
-        logging.error(f"Error: {e}")
-        return False
+def get_wav_duration(audio_path):
+    """Return the duration of a .wav file in seconds from its header."""
+    with wave.open(audio_path, 'rb') as wav_file:
+        return wav_file.getnframes() / wav_file.getframerate()
+
+def parse_timestamp(timestamp):
+    """Convert an HH:MM:SS.mmm timestamp into milliseconds."""
+    hours, minutes, seconds = timestamp.split(":")
+    return round((int(hours) * 3600 + int(minutes) * 60 + float(seconds)) * 1000)
 
-def convert_to_16khz(audio_path):
-    """Convert an audio file to 16 kHz using ffmpeg."""
-    logging.info("Converting the audio file to 16 kHz using ffmpeg.")
-    converted_path = audio_path.replace(".wav", "_16khz.wav")
+def format_timestamp(milliseconds):
+    """Convert milliseconds into an HH:MM:SS.mmm timestamp."""
+    seconds, milliseconds = divmod(int(milliseconds), 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
 
-    if os.path.exists(converted_path):
-        logging.info(f"Removing existing file: {converted_path}")
-        os.remove(converted_path)
+def shift_timestamps(transcription, offset):
+    """Rebase segment-relative timestamps by `offset` seconds onto the original timeline."""
+    offset_ms = round(offset * 1000)
+    shifted = []
+    for entry in transcription:
+        start, end = entry["timestamp"].split(" --> ")
+        timestamp = f"{format_timestamp(parse_timestamp(start) + offset_ms)} --> {format_timestamp(parse_timestamp(end) + offset_ms)}"
+        shifted.append({"timestamp": timestamp, "text": entry["text"]})
+    return shifted
 
+def is_whisper_wav(audio_path):
+    """Check if a file is already a 16 kHz mono 16-bit PCM .wav that whisper.cpp can read as is."""
+    if not audio_path.lower().endswith('.wav'):
+        return False
     try:
-        subprocess.run([ffmpeg_binary_path, '-i', audio_path, '-ar', '16000', converted_path], check=True)
-        logging.info(f"Converted audio to 16 kHz: {converted_path}")
-        return converted_path
-    except subprocess.CalledProcessError as e:
-        logging.error(f"ffmpeg conversion failed: {e}")
-        raise RuntimeError("Failed to convert audio to 16 kHz")
+        with wave.open(audio_path, 'rb') as wav_file:
+            return (wav_file.getframerate(), wav_file.getnchannels(), wav_file.getsampwidth()) == (WHISPER_SAMPLE_RATE, 1, 2)
+    except (wave.Error, EOFError) as e:
+        logging.info(f"{audio_path} is not a PCM .wav file whisper.cpp can read directly: {e}")
+        return False
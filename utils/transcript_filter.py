@@ -0,0 +1,71 @@
+import logging
+import re
+
+from utils.token_counter import token_counter
+
+# Recent kept lines a line is compared against when dropping repeats
+DEDUPE_WINDOW = 5
+
+# Non-speech annotations whisper emits, e.g. [BLANK_AUDIO], [ Silence ], (music playing), ♪
+marker_re = re.compile(r"\[[^\]]*\]|^\s*\([^)]*\)\s*$|[♪♫]+")
+
+
+def strip_markers(text):
+    """Remove non-speech markers from a transcript line."""
+    return re.sub(r"\s{2,}", " ", marker_re.sub(" ", text)).strip()
+
+
+def _normalize(text):
+    return re.sub(r"[^a-z0-9 ]", "", text.lower()).strip()
+
+
+def salient_entries(entries, keep):
+    """Keep the `keep` entries whose TF-IDF vectors are closest to the transcript's centroid, in order."""
+    import numpy as np
+
+    from utils.extractive_summarizer import tfidf_matrix
+
+    if len(entries) <= keep:
+        return entries
+    matrix = tfidf_matrix([entry["text"] for entry in entries])
+    centroid = matrix.mean(axis=0)
+    scores = matrix @ (centroid / (np.linalg.norm(centroid) or 1.0))
+    selected = np.sort(np.argsort(-scores, kind="stable")[:keep])
+    return [entries[index] for index in selected]
+
+
+def filter_transcript(transcription_data, keep=None, count=None):
+    """Shrink a transcript before summarization.
+
+    Drops non-speech markers and lines repeating one of the last few kept lines (whisper's
+    hallucination loops), then with `keep` retains only the `keep` most salient lines.
+    Logs how many tokens the summarizer is spared, counted with `count`, by default estimated
+    from the text length so that backends without a tokenizer don't load one.
+    """
+    count = count or token_counter.estimate
+    filtered = []
+    recent = []
+    markers = repeats = 0
+    for entry in transcription_data:
+        text = strip_markers(entry["text"])
+        if text != entry["text"].strip():
+            markers += 1
+        normalized = _normalize(text)
+        if not normalized:
+            continue
+        if normalized in recent:
+            repeats += 1
+            continue
+        recent = (recent + [normalized])[-DEDUPE_WINDOW:]
+        filtered.append({**entry, "text": text})
+
+    if keep:
+        filtered = salient_entries(filtered, keep)
+
+    tokens_before = count(" ".join(entry["text"] for entry in transcription_data))
+    tokens_after = count(" ".join(entry["text"] for entry in filtered))
+    saved = tokens_before - tokens_after
+    logging.info(f"Transcript filter: removed {markers} markers and {repeats} repeated lines, kept "
+                 f"{len(filtered)}/{len(transcription_data)} lines, ~{tokens_before} -> ~{tokens_after} tokens "
+                 f"(saved {saved}, {100 * saved / max(tokens_before, 1):.0f}%)")
+    return filtered
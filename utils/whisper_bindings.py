@@ -0,0 +1,218 @@
+import ctypes
+import logging
+import os
+import threading
+
+from utils.whisper_paths import WHISPER_LIBRARY_PATH, WHISPER_MODEL_PATH
+
+WHISPER_SAMPLING_GREEDY = 0
+
+_library = None
+_model = None
+_lock = threading.Lock()
+_model_lock = threading.Lock()
+
+
+# Mirrors of the structs in third-party/whisper.cpp/include/whisper.h. They are passed by value,
+# so field order and types must match the vendored header exactly.
+class WhisperAheads(ctypes.Structure):
+    _fields_ = [
+        ("n_heads", ctypes.c_size_t),
+        ("heads", ctypes.c_void_p),
+    ]
+
+
+class WhisperContextParams(ctypes.Structure):
+    _fields_ = [
+        ("use_gpu", ctypes.c_bool),
+        ("flash_attn", ctypes.c_bool),
+        ("gpu_device", ctypes.c_int),
+        ("dtw_token_timestamps", ctypes.c_bool),
+        ("dtw_aheads_preset", ctypes.c_int),
+        ("dtw_n_top", ctypes.c_int),
+        ("dtw_aheads", WhisperAheads),
+        ("dtw_mem_size", ctypes.c_size_t),
+    ]
+
+
+class _GreedyParams(ctypes.Structure):
+    _fields_ = [("best_of", ctypes.c_int)]
+
+
+class _BeamSearchParams(ctypes.Structure):
+    _fields_ = [("beam_size", ctypes.c_int), ("patience", ctypes.c_float)]
+
+
+class WhisperFullParams(ctypes.Structure):
+    _fields_ = [
+        ("strategy", ctypes.c_int),
+        ("n_threads", ctypes.c_int),
+        ("n_max_text_ctx", ctypes.c_int),
+        ("offset_ms", ctypes.c_int),
+        ("duration_ms", ctypes.c_int),
+        ("translate", ctypes.c_bool),
+        ("no_context", ctypes.c_bool),
+        ("no_timestamps", ctypes.c_bool),
+        ("single_segment", ctypes.c_bool),
+        ("print_special", ctypes.c_bool),
+        ("print_progress", ctypes.c_bool),
+        ("print_realtime", ctypes.c_bool),
+        ("print_timestamps", ctypes.c_bool),
+        ("token_timestamps", ctypes.c_bool),
+        ("thold_pt", ctypes.c_float),
+        ("thold_ptsum", ctypes.c_float),
+        ("max_len", ctypes.c_int),
+        ("split_on_word", ctypes.c_bool),
+        ("max_tokens", ctypes.c_int),
+        ("debug_mode", ctypes.c_bool),
+        ("audio_ctx", ctypes.c_int),
+        ("tdrz_enable", ctypes.c_bool),
+        ("suppress_regex", ctypes.c_char_p),
+        ("initial_prompt", ctypes.c_char_p),
+        ("prompt_tokens", ctypes.POINTER(ctypes.c_int32)),
+        ("prompt_n_tokens", ctypes.c_int),
+        ("language", ctypes.c_char_p),
+        ("detect_language", ctypes.c_bool),
+        ("suppress_blank", ctypes.c_bool),
+        ("suppress_non_speech_tokens", ctypes.c_bool),
+        ("temperature", ctypes.c_float),
+        ("max_initial_ts", ctypes.c_float),
+        ("length_penalty", ctypes.c_float),
+        ("temperature_inc", ctypes.c_float),
+        ("entropy_thold", ctypes.c_float),
+        ("logprob_thold", ctypes.c_float),
+        ("no_speech_thold", ctypes.c_float),
+        ("greedy", _GreedyParams),
+        ("beam_search", _BeamSearchParams),
+        ("new_segment_callback", ctypes.c_void_p),
+        ("new_segment_callback_user_data", ctypes.c_void_p),
+        ("progress_callback", ctypes.c_void_p),
+        ("progress_callback_user_data", ctypes.c_void_p),
+        ("encoder_begin_callback", ctypes.c_void_p),
+        ("encoder_begin_callback_user_data", ctypes.c_void_p),
+        ("abort_callback", ctypes.c_void_p),
+        ("abort_callback_user_data", ctypes.c_void_p),
+        ("logits_filter_callback", ctypes.c_void_p),
+        ("logits_filter_callback_user_data", ctypes.c_void_p),
+        ("grammar_rules", ctypes.c_void_p),
+        ("n_grammar_rules", ctypes.c_size_t),
+        ("i_start_rule", ctypes.c_size_t),
+        ("grammar_penalty", ctypes.c_float),
+    ]
+
+
+# void (*ggml_log_callback)(enum ggml_log_level level, const char * text, void * user_data)
+_LOG_CALLBACK = ctypes.CFUNCTYPE(None, ctypes.c_int, ctypes.c_char_p, ctypes.c_void_p)
+
+
+@_LOG_CALLBACK
+def _log_to_logging(level, text, user_data):
+    # whisper.cpp reports model loading and timings at length; keep it out of the regular log
+    logging.debug(f"whisper.cpp: {text.decode(errors='replace').rstrip()}")
+
+
+def is_available(library_path=WHISPER_LIBRARY_PATH, model_path=WHISPER_MODEL_PATH):
+    """Whether the shared library and model needed for in-process transcription are present."""
+    return os.path.exists(library_path) and os.path.exists(model_path)
+
+
+def load_library(library_path=WHISPER_LIBRARY_PATH):
+    """Load libwhisper once per process and declare the signatures of the functions used."""
+    global _library
+    with _lock:
+        if _library is not None:
+            return _library
+
+        library = ctypes.CDLL(os.path.abspath(library_path))
+
+        library.whisper_context_default_params.restype = WhisperContextParams
+        library.whisper_context_default_params.argtypes = []
+        library.whisper_init_from_file_with_params.restype = ctypes.c_void_p
+        library.whisper_init_from_file_with_params.argtypes = [ctypes.c_char_p, WhisperContextParams]
+        library.whisper_free.restype = None
+        library.whisper_free.argtypes = [ctypes.c_void_p]
+        library.whisper_init_state.restype = ctypes.c_void_p
+        library.whisper_init_state.argtypes = [ctypes.c_void_p]
+        library.whisper_free_state.restype = None
+        library.whisper_free_state.argtypes = [ctypes.c_void_p]
+        library.whisper_full_default_params.restype = WhisperFullParams
+        library.whisper_full_default_params.argtypes = [ctypes.c_int]
+        library.whisper_full_with_state.restype = ctypes.c_int
+        library.whisper_full_with_state.argtypes = [ctypes.c_void_p, ctypes.c_void_p, WhisperFullParams,
+                                                    ctypes.POINTER(ctypes.c_float), ctypes.c_int]
+        library.whisper_full_n_segments_from_state.restype = ctypes.c_int
+        library.whisper_full_n_segments_from_state.argtypes = [ctypes.c_void_p]
+        library.whisper_full_get_segment_t0_from_state.restype = ctypes.c_int64
+        library.whisper_full_get_segment_t0_from_state.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        library.whisper_full_get_segment_t1_from_state.restype = ctypes.c_int64
+        library.whisper_full_get_segment_t1_from_state.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        library.whisper_full_get_segment_text_from_state.restype = ctypes.c_char_p
+        library.whisper_full_get_segment_text_from_state.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        library.whisper_log_set.restype = None
+        library.whisper_log_set.argtypes = [_LOG_CALLBACK, ctypes.c_void_p]
+
+        library.whisper_log_set(_log_to_logging, None)
+        _library = library
+        return library
+
+
+class WhisperModel:
+    """
+    A whisper.cpp model loaded in this process. Every transcription gets its own decoding state,
+    so concurrent calls share the model weights and can run in parallel threads.
+    """
+    def __init__(self, model_path=WHISPER_MODEL_PATH, library_path=WHISPER_LIBRARY_PATH):
+        self.library = load_library(library_path)
+        self.context = self.library.whisper_init_from_file_with_params(
+            model_path.encode(), self.library.whisper_context_default_params())
+        if not self.context:
+            raise RuntimeError(f"whisper.cpp failed to load the model {model_path}")
+
+    def transcribe(self, samples, threads):
+        """Transcribe 16 kHz mono float32 samples and return (start ms, end ms, text) segments.
+
+        A C-contiguous float32 NumPy array is handed to whisper.cpp without being copied.
+        """
+        import numpy as np
+
+        samples = np.ascontiguousarray(samples, dtype=np.float32)
+        params = self.library.whisper_full_default_params(WHISPER_SAMPLING_GREEDY)
+        params.n_threads = threads
+        params.print_progress = False
+        params.print_realtime = False
+        params.print_timestamps = False
+
+        state = self.library.whisper_init_state(self.context)
+        if not state:
+            raise RuntimeError("whisper.cpp failed to allocate a decoding state")
+        try:
+            # ctypes releases the GIL for the duration of the call
+            result = self.library.whisper_full_with_state(
+                self.context, state, params, samples.ctypes.data_as(ctypes.POINTER(ctypes.c_float)), len(samples))
+            if result != 0:
+                raise RuntimeError(f"whisper_full failed with code {result}")
+
+            segments = []
+            for index in range(self.library.whisper_full_n_segments_from_state(state)):
+                # whisper.cpp reports times in 10 ms units
+                start = self.library.whisper_full_get_segment_t0_from_state(state, index) * 10
+                end = self.library.whisper_full_get_segment_t1_from_state(state, index) * 10
+                text = self.library.whisper_full_get_segment_text_from_state(state, index).decode(errors="replace")
+                segments.append((start, end, text.strip()))
+            return segments
+        finally:
+            self.library.whisper_free_state(state)
+
+    def close(self):
+        if self.context:
+            self.library.whisper_free(self.context)
+            self.context = None
+
+
+def get_model():
+    """Return the process-wide whisper.cpp model, loading it on first use."""
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = WhisperModel()
+        return _model
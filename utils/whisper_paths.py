@@ -0,0 +1,10 @@
+import os
+
+# Locations of the vendored whisper.cpp build and model, relative to the repository root
+WHISPER_CPP_DIR = os.path.join("third-party", "whisper.cpp")
+WHISPER_BINARY_PATH = os.path.join(WHISPER_CPP_DIR, "main")
+# Built next to `main` by `make libwhisper.so`, with an rpath to the libggml.so beside it
+WHISPER_LIBRARY_PATH = os.path.join(WHISPER_CPP_DIR, "libwhisper.so")
+# Built by whisper.cpp's default make target from examples/server
+WHISPER_SERVER_PATH = os.path.join(WHISPER_CPP_DIR, "server")
+WHISPER_MODEL_PATH = os.path.join(WHISPER_CPP_DIR, "models", "ggml-base.en.bin")
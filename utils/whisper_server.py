@@ -0,0 +1,274 @@
+import logging
+import os
+import subprocess
+import threading
+
+from utils.readiness import wait_until_ready
+from utils.whisper_paths import WHISPER_MODEL_PATH, WHISPER_SERVER_PATH
+
+WHISPER_SERVER_HOST = "127.0.0.1"
+# Instances of the pool listen on consecutive ports from this one
+WHISPER_SERVER_PORT = int(os.environ.get("AVS_WHISPER_SERVER_PORT", "8178"))
+# A single whisper.cpp instance stops scaling well past a few threads, so large hosts run several;
+# every instance gets this many CPUs unless AVS_WHISPER_SERVERS fixes the number of instances
+WHISPER_SERVER_THREADS = int(os.environ.get("AVS_WHISPER_SERVER_THREADS", "4"))
+WHISPER_SERVERS = int(os.environ.get("AVS_WHISPER_SERVERS", "0"))
+# Set while servers launched by this process are up, so worker processes send their audio to them too
+WHISPER_SERVER_URLS_ENV = "AVS_WHISPER_SERVER_URLS"
+
+# How long a launched server may take to load the model and start listening
+STARTUP_TIMEOUT = 30
+# (connect, read) timeouts in seconds; a long segment can take minutes to transcribe
+REQUEST_TIMEOUT = (5, 900)
+
+# The pool launched by this process, or a client for the one launched by the parent process
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class WhisperServer:
+    """
+    A whisper.cpp server keeping the model loaded between transcriptions. A server launched with
+    `start()` is supervised: it is restarted if it exits, on the same CPUs. Requests share a pooled
+    HTTP connection.
+    """
+    def __init__(self, url=None, port=WHISPER_SERVER_PORT, cpus=None, model_path=WHISPER_MODEL_PATH):
+        import requests
+
+        self.port = port
+        self.url = url or f"http://{WHISPER_SERVER_HOST}:{port}"
+        self.cpus = sorted(cpus) if cpus else None
+        self.threads = len(self.cpus) if self.cpus else os.cpu_count() or 1
+        self.model_path = model_path
+        self.process = None
+        self.session = requests.Session()
+        # Requests in flight, used by the pool to pick the least loaded instance
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def is_ready(self, timeout=1):
+        """Health-check the server; it answers once the model is loaded and it is listening."""
+        import requests
+
+        try:
+            return self.session.get(self.url, timeout=timeout).status_code == 200
+        except requests.exceptions.RequestException:
+            return False
+
+    def has_exited(self):
+        return self.process is not None and self.process.poll() is not None
+
+    def launch(self):
+        """Launch the server process pinned to its CPUs, without waiting for it to be ready."""
+        cmd = ["./" + WHISPER_SERVER_PATH, "-m", self.model_path, "-t", str(self.threads),
+               "--host", WHISPER_SERVER_HOST, "--port", str(self.port)]
+        logging.debug(f"cmd: {subprocess.list2cmdline(cmd)}")
+        self.process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if self.cpus and hasattr(os, "sched_setaffinity"):
+            # Set right after launch rather than in a preexec_fn, which isn't safe with threads around;
+            # the server starts its compute threads only once the model is loaded, so they inherit it
+            try:
+                os.sched_setaffinity(self.process.pid, self.cpus)
+            except OSError as e:
+                logging.warning(f"Unable to pin the whisper.cpp server on port {self.port} to CPUs {self.cpus}: {e}")
+
+    def wait_ready(self):
+        """Wait until a launched server is ready. Raises RuntimeError if it doesn't come up."""
+        if wait_until_ready(self.is_ready, self.process, STARTUP_TIMEOUT):
+            logging.info(f"whisper.cpp server listening at {self.url} with {self.threads} threads")
+            return
+
+        self.stop()
+        raise RuntimeError(f"whisper.cpp server failed to start on port {self.port}")
+
+    def start(self):
+        """Launch the server and wait until it is ready. Raises RuntimeError if it doesn't come up."""
+        self.launch()
+        self.wait_ready()
+
+    def ensure_running(self):
+        """Restart a launched server that has exited."""
+        with self._lock:
+            if self.has_exited():
+                logging.warning(f"whisper.cpp server on port {self.port} exited with code "
+                                f"{self.process.returncode}, restarting it")
+                self.start()
+
+    def transcribe(self, wav_data):
+        """Transcribe a 16 kHz mono .wav held in memory and return (start ms, end ms, text) segments.
+
+        Raises requests.exceptions.RequestException or RuntimeError when the server can't transcribe it.
+        """
+        response = self.session.post(
+            f"{self.url}/inference",
+            files={"file": ("audio.wav", wav_data, "audio/wav")},
+            data={"response_format": "verbose_json"},
+            timeout=REQUEST_TIMEOUT,
+        )
+        response.raise_for_status()
+        body = response.json()
+        if "error" in body:
+            raise RuntimeError(body["error"])
+        # verbose_json reports times in seconds
+        return [
+            (round(segment["start"] * 1000), round(segment["end"] * 1000), segment["text"].strip())
+            for segment in body.get("segments", [])
+        ]
+
+    def stop(self, timeout=5):
+        """Shut the server down if this process launched it."""
+        if self.process is not None and self.process.poll() is None:
+            logging.info(f"Stopping whisper.cpp server on port {self.port}...")
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        self.process = None
+
+    def close(self):
+        self.stop()
+        self.session.close()
+
+
+class WhisperServerPool:
+    """
+    Several whisper.cpp servers, each pinned to its own CPUs. Every transcription goes to the
+    instance with the fewest requests in flight; an instance that crashed is restarted first.
+    """
+    def __init__(self, servers):
+        self.servers = servers
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        with self._lock:
+            server = min(self.servers, key=lambda server: server.active)
+            server.active += 1
+            return server
+
+    def _release(self, server):
+        with self._lock:
+            server.active -= 1
+
+    def transcribe(self, wav_data):
+        """Transcribe a 16 kHz mono .wav on the least loaded instance, see WhisperServer.transcribe."""
+        import requests
+
+        server = self._acquire()
+        try:
+            logging.debug(f"Transcribing on {server.url} ({server.active} requests in flight)")
+            server.ensure_running()
+            try:
+                return server.transcribe(wav_data)
+            except requests.exceptions.ConnectionError:
+                # The instance may have crashed mid-request: bring it back and retry once
+                if not server.has_exited():
+                    raise
+                server.ensure_running()
+                return server.transcribe(wav_data)
+        finally:
+            self._release(server)
+
+    def close(self):
+        for server in self.servers:
+            server.close()
+
+
+def is_available():
+    """Whether the server binary and model needed to launch a server are present."""
+    return os.path.exists(WHISPER_SERVER_PATH) and os.path.exists(WHISPER_MODEL_PATH)
+
+
+def _cpu_topology(cpu):
+    """Return the (package, core) a CPU belongs to, or (0, cpu) when sysfs doesn't say."""
+    topology = os.path.join("/sys/devices/system/cpu", f"cpu{cpu}", "topology")
+    try:
+        with open(os.path.join(topology, "physical_package_id")) as package_file, \
+                open(os.path.join(topology, "core_id")) as core_file:
+            return int(package_file.read()), int(core_file.read())
+    except (OSError, ValueError):
+        return 0, cpu
+
+
+def server_cpu_sets(servers=WHISPER_SERVERS, threads=WHISPER_SERVER_THREADS):
+    """Split the CPUs this process may run on between the instances of a pool.
+
+    CPUs are ordered by socket and physical core so every instance gets whole cores, hyperthread
+    siblings included, on a single socket where possible. Without an explicit number of
+    instances there is one per `threads` CPUs.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = sorted(os.sched_getaffinity(0), key=lambda cpu: (*_cpu_topology(cpu), cpu))
+    else:
+        cpus = list(range(os.cpu_count() or 1))
+    count = min(len(cpus), servers or max(1, len(cpus) // max(1, threads)))
+    # Spread leftover CPUs over the first instances rather than leaving them idle
+    size, extra = divmod(len(cpus), count)
+    cpu_sets = []
+    start = 0
+    for index in range(count):
+        end = start + size + (1 if index < extra else 0)
+        cpu_sets.append(cpus[start:end])
+        start = end
+    return cpu_sets
+
+
+def start_server(servers=WHISPER_SERVERS, threads=WHISPER_SERVER_THREADS):
+    """Launch the process-wide pool of whisper.cpp servers and advertise it to worker processes.
+
+    Returns the pool and whether this call created it; a pool that is already up, e.g. the
+    daemon's when a batch runs inside it, is returned as it is. Instances already listening on
+    their port are used as they are. Raises RuntimeError, after stopping the instances it
+    launched, if any instance doesn't come up.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            return _pool, False
+        pool = WhisperServerPool([
+            WhisperServer(port=WHISPER_SERVER_PORT + index, cpus=cpus)
+            for index, cpus in enumerate(server_cpu_sets(servers, threads))
+        ])
+        # Launch every instance before waiting, so the models load concurrently
+        launched = []
+        for server in pool.servers:
+            if server.is_ready():
+                logging.info(f"Using the whisper.cpp server already running at {server.url}")
+            else:
+                server.launch()
+                launched.append(server)
+        try:
+            for server in launched:
+                server.wait_ready()
+        except RuntimeError:
+            pool.close()
+            raise
+        logging.info(f"Transcribing on {len(pool.servers)} whisper.cpp servers")
+        _pool = pool
+        os.environ[WHISPER_SERVER_URLS_ENV] = ",".join(server.url for server in pool.servers)
+        return pool, True
+
+
+def stop_server():
+    """Stop using the process-wide pool, shutting down the servers this process launched."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            os.environ.pop(WHISPER_SERVER_URLS_ENV, None)
+            _pool = None
+
+
+def get_server():
+    """Return the pool transcriptions should use: this process's own, or the one its parent launched.
+
+    Returns None when no server is up.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None and os.environ.get(WHISPER_SERVER_URLS_ENV):
+            _pool = WhisperServerPool([
+                WhisperServer(url=url) for url in os.environ[WHISPER_SERVER_URLS_ENV].split(",")
+            ])
+        return _pool